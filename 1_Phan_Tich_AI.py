@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import google.generativeai as genai
-from GoogleNews import GoogleNews
-import requests
-from datetime import datetime, timedelta
+from core.charting import candle_chart
+from core.indicators import add_indicators
+from core.llm import get_llm
+from core.metrics import record_error, timed_stage
+from core.news import get_news_service
+from core.signals import detect_smart_money, vsa_panel
+from core.store import RESOLUTIONS, get_store
 
 # =============================================================================
 # CẤU HÌNH GIAO DIỆN
@@ -32,67 +33,47 @@ st.markdown("""
 @st.cache_data(ttl=3600)
 def load_data_auto(ticker):
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-        from_ts = int(start_date.timestamp())
-        to_ts = int(end_date.timestamp())
-        url = f"https://dchart-api.vndirect.com.vn/dchart/history?symbol={ticker}&resolution=D&from={from_ts}&to={to_ts}"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        data = response.json()
-        if data.get('s') != 'ok': return None, "Mã không tồn tại."
-        df = pd.DataFrame({'Date': pd.to_datetime(data['t'], unit='s'), 'Open': data['o'], 'High': data['h'], 'Low': data['l'], 'Close': data['c'], 'Volume': data['v']})
+        # Đọc từ kho nến trên đĩa, chỉ tải thêm các phiên mới
+        df = get_store().load(ticker, days=365)
+        # Cần ít nhất 2 phiên trong cửa sổ (kho có thể chỉ còn nến cũ hơn 365 ngày)
+        if df is None or len(df) < 2: return None, "Mã không tồn tại."
         return df, "OK"
-    except Exception as e: return None, str(e)
+    except Exception as e:
+        record_error('load_data_auto', e)
+        return None, str(e)
+
+CHART_RESOLUTIONS = {"Ngày": "D", "60 phút": "60", "15 phút": "15", "5 phút": "5", "1 phút": "1"}
+
+@st.cache_data(ttl=60)
+def load_chart_data(ticker, resolution):
+    # Nến trong phiên cho biểu đồ, lưu kho riêng theo từng khung thời gian
+    try: return get_store(resolution).load(ticker, days=RESOLUTIONS[resolution])
+    except Exception as e:
+        record_error('load_chart_data', e)
+        return None
 
 # =============================================================================
 # AUTO-STORY ENGINE (QUÉT TIN TỨC TỰ ĐỘNG)
 # =============================================================================
-def get_auto_stories(ticker):
+def get_auto_stories(news_future):
     try:
-        # Quét tin tức trong 7 ngày qua từ các nguồn uy tín qua Google News
-        googlenews = GoogleNews(lang='vi', region='VN', period='7d')
-        googlenews.search(f"Cổ phiếu {ticker}")
-        results = googlenews.result()
-        if not results:
-            return "Không tìm thấy câu chuyện riêng đáng chú ý trong tuần qua."
-        
-        # Lấy 5 tiêu đề tin tức mới nhất để AI tổng hợp
-        stories = [f"- {res['title']} ({res['date']})" for res in results[:5]]
-        return "\n".join(stories)
-    except:
+        # Tin 7 ngày qua từ Google News (tải nền, qua bộ đệm dùng chung với Radar)
+        return news_future.result()
+    except Exception as e:
+        record_error('get_auto_stories', e)
         return "Hiện chưa quét được tin tức mới từ hệ thống."
 
-def detect_smart_money(open_p, high_p, low_p, close_p, vol, vol_ma20):
-    if vol_ma20 == 0: return "Không xác định"
-    vol_ratio = vol / vol_ma20
-    body = close_p - open_p
-    range_p = high_p - low_p
-    if vol_ratio > 1.3:
-        if close_p > open_p and (high_p - close_p) < (range_p * 0.3): return "🔥 CÁ MẬP VÀO HÀNG"
-        elif close_p < open_p and (close_p - low_p) < (range_p * 0.3): return "⚠️ CÁ MẬP XẢ HÀNG"
-    return "Dòng tiền bình thường"
-
 def calculate_advanced_metrics(df):
-    df['EMA_20'] = df['Close'].ewm(span=20).mean()
-    df['MA_50'] = df['Close'].rolling(50).mean()
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    df['Vol_MA20'] = df['Volume'].rolling(20).mean()
-    df['Vol_Ratio'] = df['Volume'] / df['Vol_MA20']
-    return df
+    # Dùng chung bộ chỉ báo vector hóa với Radar
+    return add_indicators(df)
 
 # =============================================================================
 # AI PROMPT (GEMINI 3.6 FLASH)
 # =============================================================================
-def ask_wolf_ai(api_key, ticker, tech_data, news_stories, pos_info):
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-3.6-flash')
-    
-    prompt = f"""
+WOLF_BOX = "<div class='wolf-box'><h2 style='color:#d4af37; text-align:center;'>📜 CHIẾN LƯỢC TỰ ĐỘNG</h2>{}</div>"
+
+def build_wolf_prompt(ticker, tech_data, news_stories, pos_info):
+    return f"""
     Bạn là "Sói già phố Wall", chuyên gia VSA 10 năm kinh nghiệm tại Việt Nam.
     KHÁCH HÀNG: {pos_info} (Mã: {ticker})
     
@@ -117,10 +98,19 @@ def ask_wolf_ai(api_key, ticker, tech_data, news_stories, pos_info):
     ### 4. LỜI KHUYÊN SÓI GIÀ
     - Chốt hạ 1 câu về tâm lý hành vi của mã này.
     """
+
+def stream_wolf_ai(placeholder, api_key, ticker, tech_data, news_stories, pos_info):
+    # Hiện chữ vào wolf-box ngay khi model trả về từng đoạn
+    text = ""
     try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e: return f"⚠️ Lỗi AI: {str(e)}"
+        for chunk in get_llm(api_key).stream(build_wolf_prompt(ticker, tech_data, news_stories, pos_info)):
+            text += chunk
+            placeholder.markdown(WOLF_BOX.format(text), unsafe_allow_html=True)
+    except Exception as e:
+        record_error('stream_wolf_ai', e)
+        text += f"\n\n⚠️ Lỗi AI: {str(e)}"
+        placeholder.markdown(WOLF_BOX.format(text), unsafe_allow_html=True)
+    return text
 
 # =============================================================================
 # GIAO DIỆN CHÍNH
@@ -138,43 +128,50 @@ with st.sidebar:
     st.header("2. Dữ liệu Đầu tư")
     ticker = st.text_input("Mã Cổ Phiếu:", "HPG").upper()
     buy_price = st.number_input("Giá Vốn Bạn Cầm:", 0.0, step=0.1)
+    chart_label = st.selectbox("Khung biểu đồ:", list(CHART_RESOLUTIONS), index=0)
     
     btn = st.button("🚀 PHÂN TÍCH TỔNG LỰC", type="primary", use_container_width=True)
 
 if btn:
     if not api_key: st.error("Vui lòng nhập API Key.")
     else:
-        with st.spinner(f"Sói Già đang lùng sục tin tức và soi chart {ticker}..."):
-            df, msg = load_data_auto(ticker)
-            if df is None: st.error(msg)
-            else:
-                df = calculate_advanced_metrics(df)
-                last = df.iloc[-1]
-                prev = df.iloc[-2]
-                
-                # Quét câu chuyện tự động
-                news_stories = get_auto_stories(ticker)
-                
-                change_pct = ((last['Close'] - prev['Close'])/prev['Close'])*100
-                smart_money = detect_smart_money(last['Open'], last['High'], last['Low'], last['Close'], last['Volume'], last['Vol_MA20'])
-                
-                tech_data = f"- Giá: {last['Close']} ({change_pct:+.2f}%)\n- Dòng tiền: {smart_money}\n- RSI: {last['RSI']:.1f}\n- Vol Ratio: {last['Vol_Ratio']:.1f}x"
-                
-                pos_info = f"Vốn: {buy_price}" if buy_price > 0 else "Chưa có vị thế"
-                wolf_advice = ask_wolf_ai(api_key, ticker, tech_data, news_stories, pos_info)
-                
-                # Hiển thị 4 thẻ chỉ số nhanh
-                c1, c2, c3, c4 = st.columns(4)
-                with c1: st.metric("GIÁ", f"{last['Close']:.2f}", f"{change_pct:+.2f}%")
-                with c2: st.metric("VOL RATIO", f"{last['Vol_Ratio']:.1f}x")
-                with c3: st.metric("RSI", f"{last['RSI']:.1f}")
-                with c4: st.metric("DÒNG TIỀN", "CÁ MẬP" if "CÁ MẬP" in smart_money else "THƯỜNG")
-                
-                # Biểu đồ
-                fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3])
-                fig.add_trace(go.Candlestick(x=df['Date'], open=df['Open'], high=df['High'], low=df['Low'], close=df['Close'], name='Giá'), row=1, col=1)
-                fig.update_layout(height=450, xaxis_rangeslider_visible=False, template="plotly_white", margin=dict(l=0, r=0, t=0, b=0))
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Báo cáo Sói Già
-                st.markdown(f"<div class='wolf-box'><h2 style='color:#d4af37; text-align:center;'>📜 CHIẾN LƯỢC TỰ ĐỘNG</h2>{wolf_advice}</div>", unsafe_allow_html=True)
+        # Tầng 1: tin tức chạy nền song song với việc tải nến
+        news_future = get_news_service().fetch_async(ticker)
+        with st.spinner(f"Sói Già đang soi chart {ticker}..."):
+            with timed_stage('analysis.load'): df, msg = load_data_auto(ticker)
+        if df is None:
+            news_future.cancel()
+            st.error(msg)
+        else:
+            # Tầng 2: thẻ chỉ số và biểu đồ hiện ngay khi có nến
+            with timed_stage('analysis.metrics'): df = calculate_advanced_metrics(df)
+            last = df.iloc[-1]
+            prev = df.iloc[-2]
+            
+            change_pct = ((last['Close'] - prev['Close'])/prev['Close'])*100
+            smart_money = detect_smart_money(last['Open'], last['High'], last['Low'], last['Close'], last['Volume'], last['Vol_MA20'])
+            
+            tech_data = f"- Giá: {last['Close']} ({change_pct:+.2f}%)\n- Dòng tiền: {smart_money}\n- RSI: {last['RSI']:.1f}\n- Vol Ratio: {last['Vol_Ratio']:.1f}x"
+            
+            pos_info = f"Vốn: {buy_price}" if buy_price > 0 else "Chưa có vị thế"
+            
+            # Hiển thị 4 thẻ chỉ số nhanh
+            c1, c2, c3, c4 = st.columns(4)
+            with c1: st.metric("GIÁ", f"{last['Close']:.2f}", f"{change_pct:+.2f}%")
+            with c2: st.metric("VOL RATIO", f"{last['Vol_Ratio']:.1f}x")
+            with c3: st.metric("RSI", f"{last['RSI']:.1f}")
+            with c4: st.metric("DÒNG TIỀN", "CÁ MẬP" if "CÁ MẬP" in smart_money else "THƯỜNG")
+            
+            # Biểu đồ (gộp nến phía server để số điểm gửi xuống trình duyệt có giới hạn)
+            resolution = CHART_RESOLUTIONS[chart_label]
+            with timed_stage('analysis.chart'):
+                chart_df = df if resolution == 'D' else load_chart_data(ticker, resolution)
+                if chart_df is None: chart_df, resolution = df, 'D'
+                signals = vsa_panel(*(chart_df[c].to_numpy(dtype=float)[None, :] for c in ('Open', 'High', 'Low', 'Close', 'Volume')))[0]
+                fig = candle_chart(chart_df, signals, intraday=resolution != 'D')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Tầng 3: chờ tin tức rồi stream báo cáo Sói Già
+            with st.spinner(f"Sói Già đang lùng sục tin tức {ticker}..."), timed_stage('analysis.news_wait'):
+                news_stories = get_auto_stories(news_future)
+            with timed_stage('analysis.ai'): stream_wolf_ai(st.empty(), api_key, ticker, tech_data, news_stories, pos_info)
\ No newline at end of file
@@ -0,0 +1,3 @@
+# =============================================================================
+# BENCHMARK CÁC ĐƯỜNG NÓNG (DỮ LIỆU / CHỈ BÁO / RADAR / DANH MỤC)
+# =============================================================================
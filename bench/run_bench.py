@@ -0,0 +1,117 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import core.quotes as quotes
+from bench.stub_server import StubServer
+from core.bars import BarPanel
+from core.cache import MemoryBackend, SharedCache
+from core.fetcher import HistoryFetcher
+from core.indicators import add_indicators
+from core.screening import build_snapshot, query_snapshot
+from core.signals import detect_smart_money
+from core.store import BarStore, bars_to_frame
+from core.universe import WATCHLIST_FULL, WATCHLIST_QUICK
+
+# =============================================================================
+# ĐO THỜI GIAN / SỐ REQUEST / BYTE / BỘ NHỚ ĐỈNH CỦA TỪNG CÔNG ĐOẠN
+# =============================================================================
+# Chạy: python -m bench.run_bench --universe quick full --out bench_result.json
+
+
+def measure(server, name, fn, repeat=1, trace_memory=True):
+    server.reset_counters()
+    if trace_memory: tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat): out = fn()
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory: tracemalloc.stop()
+    requests, nbytes = server.counters()
+    return out, {'stage': name, 'repeat': repeat, 'wall_s': wall, 'per_call_s': wall / repeat,
+                 'requests': requests, 'bytes': nbytes, 'peak_mem_bytes': peak}
+
+
+def run_universe(server, base_url, name, tickers, args):
+    stages = []
+
+    def stage(label, fn, repeat=1):
+        out, stats = measure(server, label, fn, repeat, not args.no_memory)
+        stages.append(stats)
+        return out
+
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = HistoryFetcher(base_url=base_url, max_workers=args.workers, rate_per_host=args.rate)
+        # TTL 0: mỗi lần gọi đều đi qua bước đồng bộ chênh lệch với máy chủ giả lập
+        store = BarStore(root=root, fetcher=fetcher, max_age=0, cache=SharedCache('bench-bars', ttl=0, backend=MemoryBackend()))
+
+        # load_data_auto: lần đầu tải đủ 365 ngày, lần sau chỉ tải phần chênh lệch
+        df = stage('load_data_auto.cold', lambda: store.load(tickers[0], days=365))
+        stage('load_data_auto.warm', lambda: store.load(tickers[0], days=365))
+
+        stage('calculate_advanced_metrics', lambda: add_indicators(df.copy()), args.repeat)
+        df = add_indicators(df.copy())
+        rows = list(zip(df['Open'], df['High'], df['Low'], df['Close'], df['Volume'], df['Vol_MA20'].fillna(0)))
+        stage('detect_smart_money.all_bars', lambda: [detect_smart_money(*r) for r in rows], args.repeat)
+
+        # Radar: đồng bộ kho cho cả vùng mã, dựng khối nến + bảng sàng lọc rồi truy vấn
+        start_ts = int(time.time()) - 90 * 86400
+        bars = stage('scan.sync.cold', lambda: store.sync_many(tickers, days=90))
+        stage('scan.sync.warm', lambda: store.sync_many(tickers, days=90))
+        panel = stage('scan.build_panel', lambda: BarPanel.from_bars(bars, start_ts), args.repeat)
+        snap = stage('scan.build_snapshot', lambda: build_snapshot(panel), args.repeat)
+        frames_bytes = sum(bars_to_frame(b[b['t'] >= start_ts]).memory_usage(deep=True).sum() for b in bars.values())
+        stage('scan.query', lambda: query_snapshot(snap, 40, 70, True, True, sort_by='RSI', top_n=20), args.repeat)
+
+        # Danh mục: 40 dòng có mã trùng, lần đầu trượt đệm báo giá, lần sau trúng đệm
+        book = [tickers[i % min(len(tickers), 30)] for i in range(40)]
+        quotes.quote_cache.clear()
+        stage('portfolio_refresh.cold', lambda: quotes.get_current_prices(book, store=store))
+        stage('portfolio_refresh.cached', lambda: quotes.get_current_prices(book, store=store), args.repeat)
+    return {'universe': name, 'tickers': len(tickers), 'panel_bytes': int(panel.nbytes), 'dataframe_bytes': int(frames_bytes), 'stages': stages}
+
+
+def git_version():
+    try: return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True).stdout.strip() or None
+    except OSError: return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các đường nóng với máy chủ dchart giả lập")
+    parser.add_argument('--universe', nargs='+', choices=['quick', 'full'], default=['quick', 'full'])
+    parser.add_argument('--fixtures', help="Thư mục chứa {MÃ}.json theo định dạng dchart (mặc định: dữ liệu tổng hợp)")
+    parser.add_argument('--latency-ms', type=float, default=20, help="Độ trễ giả lập mỗi request")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help="Giới hạn request/giây mỗi host (0 = không giới hạn)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--no-memory', action='store_true', help="Tắt tracemalloc (đo thời gian chính xác hơn)")
+    parser.add_argument('--out', help="Ghi JSON ra file thay vì stdout")
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.fixtures, args.latency_ms)
+    base_url = server.start()
+    universes = {'quick': WATCHLIST_QUICK, 'full': sorted(WATCHLIST_FULL)}
+    try:
+        report = {
+            'version': git_version(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'config': {k: v for k, v in vars(args).items() if k != 'out'},
+            'results': [run_universe(server, base_url, u, universes[u], args) for u in args.universe],
+        }
+    finally:
+        server.stop()
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f: f.write(text + "\n")
+    else: print(text)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# =============================================================================
+# MÁY CHỦ GIẢ LẬP /dchart/history (DỮ LIỆU TỔNG HỢP HOẶC FILE JSON GHI SẴN)
+# =============================================================================
+RESOLUTION_SECONDS = {'D': 86400, '1': 60, '5': 300, '15': 900, '60': 3600}
+
+
+def synthetic_history(symbol, from_ts, to_ts, resolution='D'):
+    # Chuỗi giá ngẫu nhiên cố định theo mã, chỉ gồm ngày làm việc
+    step = RESOLUTION_SECONDS.get(str(resolution), 86400)
+    origin = 1_500_000_000 // step * step
+    idx = np.arange(max(0, (from_ts - origin + step - 1) // step), (to_ts - origin) // step + 1)
+    ts = origin + idx * step
+    ts = ts[((ts // 86400) + 3) % 7 < 5]
+    if not len(ts): return {'s': 'no_data'}
+    # Giá là hàm của (mã, chỉ số nến) nên các lần tải chồng lấn luôn khớp nhau
+    seed = zlib.crc32(symbol.encode())
+    rng = np.random.default_rng(seed)
+    base, phase, liquidity = rng.uniform(5, 100), rng.uniform(0, 6.28), rng.uniform(2e4, 5e6)
+    k = (ts - origin) // step
+    noise = np.modf(np.abs(np.sin(k * 12.9898 + seed % 1000) * 43758.5453))[0] - 0.5
+    close = base * np.exp(0.25 * np.sin(k / 40 + phase) + 0.08 * np.sin(k / 7 + phase) + 0.02 * noise)
+    open_ = close * (1 - 0.02 * noise)
+    high = np.maximum(open_, close) * 1.01
+    low = np.minimum(open_, close) * 0.99
+    vol = (liquidity * (1 + 3 * np.abs(noise))).astype(np.int64)
+    return {'s': 'ok', 't': ts.tolist(), 'o': open_.round(2).tolist(), 'h': high.round(2).tolist(),
+            'l': low.round(2).tolist(), 'c': close.round(2).tolist(), 'v': vol.tolist()}
+
+
+class StubServer:
+    def __init__(self, fixtures=None, latency_ms=0):
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    def history(self, symbol, from_ts, to_ts, resolution):
+        if not self.fixtures: return synthetic_history(symbol, from_ts, to_ts, resolution)
+        path = self.fixtures / f"{symbol}.json"
+        if not path.exists(): return {'s': 'no_data'}
+        with open(path, encoding='utf-8') as f: data = json.load(f)
+        keep = [i for i, t in enumerate(data['t']) if from_ts <= t <= to_ts]
+        if not keep: return {'s': 'no_data'}
+        return {'s': 'ok', **{k: [data[k][i] for i in keep] for k in ('t', 'o', 'h', 'l', 'c', 'v')}}
+
+    def reset_counters(self):
+        with self._lock: self.requests, self.bytes = 0, 0
+
+    def counters(self):
+        with self._lock: return self.requests, self.bytes
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                if stub.latency: time.sleep(stub.latency)
+                body = json.dumps(stub.history(q['symbol'], int(q['from']), int(q['to']), q.get('resolution', 'D'))).encode()
+                with stub._lock:
+                    stub.requests += 1
+                    stub.bytes += len(body)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): pass
+
+        # Hàng đợi accept mặc định (5) làm rớt SYN khi nhiều luồng kết nối cùng lúc
+        server_cls = type('StubHTTPServer', (ThreadingHTTPServer,), {'request_queue_size': 256})
+        self._httpd = server_cls(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._httpd.server_port}/dchart/history"
+
+    def stop(self):
+        if self._httpd: self._httpd.shutdown()
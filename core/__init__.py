@@ -0,0 +1,3 @@
+# =============================================================================
+# LÕI XỬ LÝ DÙNG CHUNG CHO CÁC TRANG STREAMLIT (KHÔNG PHỤ THUỘC GIAO DIỆN)
+# =============================================================================
@@ -0,0 +1,73 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from core import backtest
+from core.metrics import record_error, timed_stage
+from core.scan import MARKET_TZ, UNIVERSES, end_of_day, next_run, run_scan, save_snapshot
+
+# =============================================================================
+# DÒNG LỆNH: python -m core scan | eod | backtest
+# =============================================================================
+
+
+def cmd_scan(args):
+    snap = run_scan(args.universe, days=args.days, on_done=None if args.quiet else lambda d, n, t: print(f"\r{d}/{n} {t:<4}", end="", flush=True))
+    if not args.quiet: print()
+    if args.out:
+        if args.out.endswith('.parquet'): snap.to_parquet(args.out, index=False)
+        else: snap.to_csv(args.out, index=False)
+        path = args.out
+    else: path = save_snapshot(snap, args.universe)
+    print(f"{len(snap)} mã -> {path}")
+
+
+def cmd_eod(args):
+    at = datetime.strptime(args.at, '%H:%M').time()
+    while True:
+        if not args.once:
+            run = next_run(datetime.now(MARKET_TZ), at)
+            print(f"Chờ tới {run:%Y-%m-%d %H:%M} ...", flush=True)
+            time.sleep(max(0, (run - datetime.now(MARKET_TZ)).total_seconds()))
+        # Một lần chạy lỗi (mạng, đĩa, file trạng thái hỏng) không được làm chết vòng lặp
+        try:
+            with timed_stage('eod'): paths = end_of_day(args.universe, keep=args.keep)
+        except Exception as e:
+            record_error('eod', e)
+            print(f"Lỗi khi chạy cuối ngày: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+            if args.once: raise SystemExit(1)
+            continue
+        for path in paths: print(f"Đã chụp {path}", flush=True)
+        if args.once: return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m core', description="Radar Sói Già chạy không giao diện")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('scan', help="Quét một vùng mã và ghi bảng sàng lọc")
+    p.add_argument('--universe', choices=list(UNIVERSES), default='full')
+    p.add_argument('--days', type=int, default=90)
+    p.add_argument('--out', help="File .csv/.parquet (mặc định: data/snapshots, nơi trang Radar đọc)")
+    p.add_argument('--quiet', action='store_true')
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser('eod', help="Chạy định kỳ sau giờ đóng cửa để dựng sẵn bảng cho Radar")
+    p.add_argument('--universe', nargs='+', choices=list(UNIVERSES), default=list(UNIVERSES))
+    p.add_argument('--at', default='15:30', help="Giờ chạy hằng ngày (giờ Việt Nam)")
+    p.add_argument('--keep', type=int, default=10, help="Số ảnh chụp giữ lại cho mỗi vùng mã")
+    p.add_argument('--once', action='store_true', help="Chạy ngay một lần rồi thoát")
+    p.set_defaults(func=cmd_eod)
+
+    p = sub.add_parser('backtest', help="Backtest tiêu chí Radar (xem core/backtest.py)", add_help=False)
+    p.set_defaults(func=None)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.cmd == 'backtest': return backtest.main(rest)
+    if rest: parser.error(f"tham số không hợp lệ: {' '.join(rest)}")
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.bars import CLOSE, BarPanel
+from core.indicators import compute_indicators
+from core.scan import PANEL_DIR
+from core.screening import MIN_LIQUIDITY, VOL_SPIKE
+from core.store import BarStore
+from core.universe import WATCHLIST_FULL, WATCHLIST_QUICK
+
+# =============================================================================
+# BACKTEST VECTOR HÓA CHO TIÊU CHÍ RADAR + NGƯỠNG CẮT LỖ/CHỐT LỜI CỦA DANH MỤC
+# =============================================================================
+# Dữ liệu là BarPanel (trục ngày chung, đọc offline từ kho hoặc từ file mmap).
+# Mỗi phiên đạt tiêu chí là một lệnh: mua giá đóng cửa, bán ở phiên đầu tiên chạm
+# ngưỡng cắt lỗ/chốt lời, hoặc khi hết số phiên nắm giữ tối đa.
+DEFAULT_PARAMS = {'rsi_min': 40, 'rsi_max': 70, 'use_ma50': True, 'use_macd': False,
+                  'stop': -7.0, 'take': 15.0, 'hold': 20, 'vol_spike': VOL_SPIKE}
+
+
+def entry_mask(close, ind, rsi_min, rsi_max, use_ma50, use_macd, vol_spike=VOL_SPIKE, min_liquidity=MIN_LIQUIDITY, **_):
+    # Cùng logic với query_snapshot nhưng áp cho mọi phiên
+    with np.errstate(invalid='ignore'):
+        mask = (ind['Vol_MA20'] >= min_liquidity) & (ind['RSI'] >= rsi_min) & (ind['RSI'] <= rsi_max)
+        if use_ma50: mask &= close >= ind['MA_50']
+        if use_macd: mask &= ind['MACD'] >= ind['MACD_Signal']
+        if not (use_ma50 or use_macd): mask &= ind['Vol_Ratio'] > vol_spike
+    return mask
+
+
+def simulate(close, mask, stop=-7.0, take=15.0, hold=20, **_):
+    # Trả về lợi nhuận (%) từng lệnh, số phiên nắm giữ và chỉ số (mã, phiên) vào lệnh
+    if close.shape[1] <= hold: return np.array([]), np.array([], dtype=int), (np.array([], dtype=int),) * 2
+    ti, di = np.nonzero(mask[:, :-hold])
+    window = sliding_window_view(close, hold + 1, axis=1)[ti, di]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fwd = (window[:, 1:] / window[:, :1] - 1) * 100
+    hit = (fwd <= stop) | (fwd >= take)
+    first = np.where(hit.any(axis=1), np.argmax(hit, axis=1), hold - 1)
+    rets = fwd[np.arange(len(first)), first]
+    ok = ~np.isnan(rets)
+    return rets[ok], first[ok] + 1, (ti[ok], di[ok])
+
+
+def equity_curve(close, days, entries):
+    # Đường vốn đánh giá theo thị trường: mỗi phiên lấy lợi nhuận close-to-close của mọi
+    # lệnh đang mở, chia đều vốn giữa các lệnh đó rồi nhân dồn; phiên không có lệnh đứng yên
+    ti, di = entries
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.nan_to_num(close[:, 1:] / close[:, :-1] - 1)
+    total = np.zeros(close.shape[1])
+    count = np.zeros(close.shape[1])
+    for offset in range(1, int(days.max(initial=0)) + 1):
+        live = days >= offset
+        d = di[live] + offset
+        np.add.at(total, d, step[ti[live], d - 1])
+        np.add.at(count, d, 1)
+    daily = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    return np.cumprod(1 + daily)
+
+
+def summarize(rets, days, entries, close):
+    if not len(rets):
+        return {'trades': 0, 'hit_rate': np.nan, 'avg_return': np.nan, 'median_return': np.nan, 'avg_hold': np.nan,
+                'total_return': np.nan, 'max_drawdown': np.nan}
+    equity = equity_curve(close, days, entries)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    return {'trades': int(len(rets)), 'hit_rate': float((rets > 0).mean() * 100), 'avg_return': float(rets.mean()),
+            'median_return': float(np.median(rets)), 'avg_hold': float(days.mean()),
+            'total_return': float((equity[-1] - 1) * 100), 'max_drawdown': float(drawdown.min() * 100)}
+
+
+def panel_inputs(panel):
+    # Chỉ báo tính trên chuỗi căn phải như Radar (phiên thiếu không làm đứt cửa sổ MA/RSI)
+    # rồi trả về trục ngày chung; giá đóng cửa điền tiếp qua phiên thiếu để định giá lệnh
+    ohlc, volume = panel.right_aligned()
+    ind = {k: panel.from_right_aligned(v) for k, v in compute_indicators(ohlc[:, :, CLOSE], volume).items()}
+    close = pd.DataFrame(panel.dense()[0]).ffill(axis=1).to_numpy()
+    return close, ind
+
+
+def run_backtest(close, ind, params=None):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    rets, days, entries = simulate(close, entry_mask(close, ind, **params), **params)
+    return {**params, **summarize(rets, days, entries, close)}
+
+
+_panel = None
+
+def _init_worker(close, ind):
+    # Mỗi tiến trình con nhận chỉ báo đã tính một lần, dùng lại cho mọi bộ tham số
+    global _panel
+    _panel = (close, ind)
+
+
+def _run_params(params):
+    close, ind = _panel
+    return run_backtest(close, ind, params)
+
+
+def sweep(close, ind, grid, processes=None):
+    # grid: {tham số: [giá trị, ...]} -> DataFrame một dòng cho mỗi tổ hợp
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    if processes == 1:
+        _init_worker(close, ind)
+        rows = [_run_params(p) for p in combos]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(close, ind)) as pool:
+            rows = list(pool.map(_run_params, combos, chunksize=max(1, len(combos) // (4 * (processes or os.cpu_count() or 1)))))
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest tiêu chí Radar trên kho nến đã lưu")
+    parser.add_argument('--universe', choices=['quick', 'full'], default='full')
+    parser.add_argument('--sync-days', type=int, default=0, help="Đồng bộ kho đủ số ngày này trước khi chạy (0 = chỉ dùng dữ liệu offline)")
+    parser.add_argument('--panel', action='store_true', help="Dùng khối nến do job cuối ngày lưu sẵn (mmap) thay vì đọc kho từng mã")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--sort', default='avg_return')
+    args = parser.parse_args(argv)
+
+    tickers = WATCHLIST_QUICK if args.universe == 'quick' else sorted(WATCHLIST_FULL)
+    if args.panel: panel = BarPanel.load(PANEL_DIR / args.universe)
+    else:
+        store = BarStore(history_days=max(args.sync_days, 365))
+        if args.sync_days: store.sync_many(tickers, days=args.sync_days)
+        panel = BarPanel.from_store(store, tickers)
+    if not len(panel): raise SystemExit("Kho nến trống: chạy lại với --sync-days để tải dữ liệu.")
+    close, ind = panel_inputs(panel)
+    grid = {'rsi_min': [30, 40, 50], 'rsi_max': [60, 70, 80], 'use_ma50': [True, False], 'use_macd': [True, False],
+            'stop': [-5.0, -7.0, -10.0], 'take': [10.0, 15.0, 20.0], 'hold': [10, 20]}
+    res = sweep(close, ind, grid, args.processes)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(res.sort_values(args.sort, ascending=False).head(20).round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
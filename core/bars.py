@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# KHỐI NẾN GỌN CHO CẢ VŨ TRỤ MÃ: OHLC float32, KHỐI LƯỢNG uint64, TRỤC NGÀY int32 DÙNG CHUNG
+# =============================================================================
+# ohlc có dạng (mã, phiên, 4) liền bộ nhớ; phiên mã không giao dịch là NaN (khối lượng 0).
+# Các thao tác theo mã trả về view, không cấp phát DataFrame.
+OPEN, HIGH, LOW, CLOSE = range(4)
+
+
+class BarPanel:
+    def __init__(self, tickers, days, ohlc, volume):
+        self.tickers = list(tickers)
+        self.days = days        # int32: số ngày kể từ 1970-01-01
+        self.ohlc = ohlc        # float32 (mã, phiên, 4)
+        self.volume = volume    # uint64 (mã, phiên)
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_bars(cls, bars_by_ticker, start_ts=None):
+        # bars_by_ticker: {mã: mảng nến của kho (t/o/h/l/c/v)}
+        bars = {}
+        for t, b in bars_by_ticker.items():
+            if b is None: continue
+            if start_ts is not None: b = b[b['t'] >= start_ts]
+            if len(b): bars[t] = b
+        days = np.unique(np.concatenate([b['t'] // 86400 for b in bars.values()])).astype(np.int32) if bars else np.array([], dtype=np.int32)
+        ohlc = np.full((len(bars), len(days), 4), np.nan, dtype=np.float32)
+        volume = np.zeros((len(bars), len(days)), dtype=np.uint64)
+        for i, b in enumerate(bars.values()):
+            pos = np.searchsorted(days, b['t'] // 86400)
+            for k, field in enumerate('ohlc'): ohlc[i, pos, k] = b[field]
+            volume[i, pos] = b['v']
+        return cls(bars, days, ohlc, volume)
+
+    @classmethod
+    def from_store(cls, store, tickers, start_ts=None):
+        # Chỉ đọc kho trên đĩa (mmap), không gọi mạng
+        return cls.from_bars({t.upper(): store.read(t) for t in tickers}, start_ts)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.ohlc.nbytes + self.volume.nbytes
+
+    def field(self, k):
+        return self.ohlc[:, :, k]
+
+    @property
+    def valid(self):
+        return ~np.isnan(self.ohlc[:, :, CLOSE])
+
+    def bar_counts(self):
+        return self.valid.sum(axis=1)
+
+    def view(self, ticker):
+        # View không sao chép của một mã
+        i = self._index[ticker]
+        return {'days': self.days, 'ohlc': self.ohlc[i], 'volume': self.volume[i]}
+
+    def frame(self, ticker):
+        v = self.view(ticker)
+        ok = ~np.isnan(v['ohlc'][:, CLOSE])
+        return pd.DataFrame({'Date': pd.to_datetime(v['days'][ok].astype(np.int64), unit='D'), 'Open': v['ohlc'][ok, OPEN], 'High': v['ohlc'][ok, HIGH],
+                             'Low': v['ohlc'][ok, LOW], 'Close': v['ohlc'][ok, CLOSE], 'Volume': v['volume'][ok]})
+
+    def subset(self, mask):
+        return BarPanel([t for t, m in zip(self.tickers, mask) if m], self.days, self.ohlc[mask], self.volume[mask])
+
+    def dense(self):
+        # Close + khối lượng float64 theo trục ngày chung, phiên thiếu là NaN
+        close = self.ohlc[:, :, CLOSE].astype(np.float64)
+        volume = self.volume.astype(np.float64)
+        volume[np.isnan(close)] = np.nan
+        return close, volume
+
+    def right_aligned(self):
+        # Dồn các phiên có giao dịch về bên phải (như nối chuỗi từng mã rồi căn phải),
+        # trả về OHLC + khối lượng float64 để tính chỉ báo khớp với bản theo từng mã
+        order = np.argsort(self.valid, axis=1, kind='stable')
+        ohlc = np.take_along_axis(self.ohlc, order[:, :, None], axis=1).astype(np.float64)
+        volume = np.take_along_axis(self.volume, order, axis=1).astype(np.float64)
+        volume[np.isnan(ohlc[:, :, CLOSE])] = np.nan
+        return ohlc, volume
+
+    def from_right_aligned(self, aligned):
+        # Ngược của right_aligned: đưa mảng (mã, vị trí căn phải) về trục ngày chung, phiên thiếu là NaN
+        valid = self.valid
+        out = np.full(aligned.shape, np.nan)
+        np.put_along_axis(out, np.argsort(valid, axis=1, kind='stable'), aligned, axis=1)
+        out[~valid] = np.nan
+        return out
+
+    def save(self, root):
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        np.save(root / 'days.npy', self.days)
+        np.save(root / 'ohlc.npy', self.ohlc)
+        np.save(root / 'volume.npy', self.volume)
+        with open(root / 'tickers.json', 'w', encoding='utf-8') as f: json.dump(self.tickers, f)
+
+    @classmethod
+    def load(cls, root, mmap=True):
+        root = Path(root)
+        mode = 'r' if mmap else None
+        with open(root / 'tickers.json', encoding='utf-8') as f: tickers = json.load(f)
+        return cls(tickers, np.load(root / 'days.npy', mmap_mode=mode), np.load(root / 'ohlc.npy', mmap_mode=mode), np.load(root / 'volume.npy', mmap_mode=mode))
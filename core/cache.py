@@ -0,0 +1,162 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core.config import DATA_DIR
+
+# =============================================================================
+# BỘ ĐỆM DÙNG CHUNG: LRU CÓ GIỚI HẠN, TTL, GỘP REQUEST TRÙNG (SINGLE-FLIGHT)
+# =============================================================================
+# Backend 'memory' dùng chung trong một tiến trình (mọi phiên Streamlit);
+# backend 'sqlite' dùng chung giữa nhiều tiến trình qua một file trên đĩa.
+CACHE_BACKEND = os.environ.get('WOLF_CACHE_BACKEND', 'memory')
+CACHE_DB = DATA_DIR / 'cache.sqlite'
+MISSING = object()
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def get(self, key):
+        hit = self._data.get(key)
+        if hit is None: return MISSING
+        if hit[1] < time.time():
+            del self._data[key]
+            return MISSING
+        self._data.move_to_end(key)
+        return hit[0]
+
+    def set(self, key, value, ttl):
+        # Trả về số mục bị loại
+        self._data[key] = (value, time.time() + ttl)
+        self._data.move_to_end(key)
+        evicted = 0
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    def __init__(self, name, max_entries=1024, path=CACHE_DB):
+        self.table = f"cache_{name}".replace('-', '_')
+        self.max_entries = max_entries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB, expires REAL, used REAL)")
+        self._lock = threading.Lock()
+        self._last_used = 0.0
+
+    def _stamp(self):
+        # Mốc dùng gần nhất tăng ngặt: time.time() trùng nhau khi gọi dồn dập làm sai thứ tự LRU
+        self._last_used = max(time.time(), self._last_used + 1e-6)
+        return self._last_used
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None: return MISSING
+            if row[1] < now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return MISSING
+            self._conn.execute(f"UPDATE {self.table} SET used = ? WHERE key = ?", (self._stamp(), key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)", (key, blob, now + ttl, self._stamp()))
+            cur = self._conn.execute(f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            return max(cur.rowcount, 0)
+
+    def clear(self):
+        with self._lock: self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._lock: return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class SharedCache:
+    def __init__(self, name, ttl, max_entries=1024, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend if backend is not None else make_backend(name, max_entries)
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'coalesced': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self.backend.get(key)
+            self.counters['hits' if value is not MISSING else 'misses'] += 1
+        return default if value is MISSING else value
+
+    def put(self, key, value):
+        with self._lock: self.counters['evictions'] += self.backend.set(key, value, self.ttl)
+
+    def get_or_load(self, key, loader):
+        # Nhiều luồng cùng trượt một khóa chỉ gọi loader một lần, các luồng khác chờ kết quả
+        with self._lock:
+            value = self.backend.get(key)
+            if value is not MISSING:
+                self.counters['hits'] += 1
+                return value
+            self.counters['misses'] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader: flight = self._inflight[key] = Future()
+            else: self.counters['coalesced'] += 1
+        if not leader: return flight.result()
+        try:
+            value = loader()
+            self.put(key, value)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            with self._lock: self.counters['errors'] += 1
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock: self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock: self.backend.clear()
+
+    def stats(self):
+        with self._lock: return {'name': self.name, 'size': len(self.backend), 'inflight': len(self._inflight), **self.counters}
+
+
+def make_backend(name, max_entries, kind=None):
+    kind = kind or CACHE_BACKEND
+    if kind == 'sqlite': return SQLiteBackend(name, max_entries)
+    if kind == 'memory': return MemoryBackend(max_entries)
+    raise ValueError(f"Backend bộ đệm không hỗ trợ: {kind}")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name, ttl, max_entries=1024, backend=None):
+    with _caches_lock:
+        if name not in _caches: _caches[name] = SharedCache(name, ttl, max_entries, backend)
+        return _caches[name]
+
+
+def cache_stats():
+    with _caches_lock: caches = list(_caches.values())
+    return [c.stats() for c in caches]
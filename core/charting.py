@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from core.signals import SIGNAL_ACCUMULATION, SIGNAL_DISTRIBUTION
+
+# =============================================================================
+# BIỂU ĐỒ NẾN: GỘP OHLC PHÍA SERVER ĐỂ SỐ ĐIỂM GỬI XUỐNG TRÌNH DUYỆT CÓ GIỚI HẠN
+# =============================================================================
+MAX_POINTS = 600
+
+
+def bucket_starts(n, max_points=MAX_POINTS):
+    # Chỉ số nến đầu của mỗi nhóm; mỗi nhóm gồm ceil(n / max_points) nến liên tiếp
+    step = max(1, -(-n // max_points))
+    return np.arange(0, n, step)
+
+
+def downsample_ohlc(df, max_points=MAX_POINTS):
+    starts = bucket_starts(len(df), max_points)
+    if len(starts) == len(df): return df, starts
+    ends = np.append(starts[1:], len(df)) - 1
+    out = pd.DataFrame({
+        'Date': df['Date'].to_numpy()[starts],
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts),
+    })
+    return out, starts
+
+
+def candle_chart(df, signals=None, intraday=False, max_points=MAX_POINTS, height=450):
+    chart, starts = downsample_ohlc(df, max_points)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.03)
+    fig.add_trace(go.Candlestick(x=chart['Date'], open=chart['Open'], high=chart['High'], low=chart['Low'], close=chart['Close'], name='Giá'), row=1, col=1)
+    colors = np.where(chart['Close'] >= chart['Open'], '#27ae60', '#c0392b')
+    fig.add_trace(go.Bar(x=chart['Date'], y=chart['Volume'], marker_color=colors, name='Khối lượng', showlegend=False), row=2, col=1)
+    if signals is not None:
+        # Nhóm nến có ít nhất một phiên cá mập vào/xả hàng thì được đánh dấu
+        acc = np.logical_or.reduceat(signals == SIGNAL_ACCUMULATION, starts)
+        dist = np.logical_or.reduceat(signals == SIGNAL_DISTRIBUTION, starts)
+        fig.add_trace(go.Scatter(x=chart['Date'][acc], y=chart['Low'][acc] * 0.98, mode='markers', marker=dict(symbol='triangle-up', color='#27ae60', size=10), name='Cá mập vào hàng'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=chart['Date'][dist], y=chart['High'][dist] * 1.02, mode='markers', marker=dict(symbol='triangle-down', color='#c0392b', size=10), name='Cá mập xả hàng'), row=1, col=1)
+    # Bỏ khoảng trống cuối tuần (và ngoài giờ giao dịch với nến trong phiên)
+    breaks = [dict(bounds=['sat', 'mon'])]
+    if intraday: breaks.append(dict(bounds=[15, 9], pattern='hour'))
+    fig.update_xaxes(rangebreaks=breaks)
+    fig.update_layout(height=height, xaxis_rangeslider_visible=False, template="plotly_white", margin=dict(l=0, r=0, t=0, b=0))
+    return fig
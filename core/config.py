@@ -0,0 +1,7 @@
+import os
+from pathlib import Path
+
+# =============================================================================
+# CẤU HÌNH CHUNG
+# =============================================================================
+DATA_DIR = Path(os.environ.get('WOLF_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.metrics import record_error, record_request, record_retry
+
+# =============================================================================
+# BỘ TẢI OHLCV SONG SONG (DCHART VNDIRECT)
+# =============================================================================
+DCHART_URL = "https://dchart-api.vndirect.com.vn/dchart/history"
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    # Token bucket cho từng host: thay cho time.sleep(0.1) cố định giữa các mã
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        if self.rate <= 0: return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, stamp = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class HistoryFetcher:
+    def __init__(self, base_url=DCHART_URL, max_workers=16, rate_per_host=30.0, retries=3, backoff=0.3, timeout=5):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(rate_per_host)
+        # Một session dùng chung, pool kết nối đủ lớn cho số luồng đang chạy
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host = urlparse(base_url).netloc
+
+    def fetch_raw(self, ticker, from_ts, to_ts, resolution='D'):
+        params = {'symbol': ticker.upper(), 'resolution': resolution, 'from': int(from_ts), 'to': int(to_ts)}
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(self._host)
+            start = time.perf_counter()
+            # Chỉ thử lại khi timeout/mất kết nối hoặc mã trong RETRY_STATUS; 4xx và JSON hỏng ném ra ngay
+            try: res = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                record_request('dchart', time.perf_counter() - start, type(e).__name__)
+                if attempt == self.retries or not isinstance(e, (requests.Timeout, requests.ConnectionError)): raise
+            else:
+                record_request('dchart', time.perf_counter() - start, res.status_code, len(res.content))
+                if res.status_code not in RETRY_STATUS:
+                    res.raise_for_status()
+                    return res.json()
+            if attempt < self.retries:
+                record_retry('dchart')
+                time.sleep(self.backoff * (2 ** attempt))
+        raise requests.HTTPError(f"{ticker}: dchart trả về lỗi sau {self.retries + 1} lần thử")
+
+    def run_many(self, fn, tickers, on_done=None):
+        # Chạy fn(mã) song song trong giới hạn max_workers; mã lỗi hoặc trả None bị bỏ qua
+        tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        out = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, t): t for t in tickers}
+            for i, fut in enumerate(as_completed(futures)):
+                ticker = futures[fut]
+                try:
+                    res = fut.result()
+                    if res is not None: out[ticker] = res
+                except Exception as e: record_error('run_many', e)
+                if on_done: on_done(i + 1, len(tickers), ticker)
+        return out
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_fetcher():
+    # Một fetcher cho cả tiến trình để tái sử dụng pool kết nối giữa các phiên
+    global _default
+    with _default_lock:
+        if _default is None: _default = HistoryFetcher()
+        return _default
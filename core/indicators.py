@@ -0,0 +1,78 @@
+import numpy as np
+
+# =============================================================================
+# BỘ CHỈ BÁO VECTOR HÓA TRÊN MA TRẬN (MÃ x PHIÊN)
+# =============================================================================
+# Mỗi hàng là một mã, căn phải theo phiên cuối; phần thiếu phía trái là NaN.
+# Kết quả khớp với pandas: ewm(span).mean() (adjust=True) và rolling(n).mean().
+
+
+def ewm_mean(x, span):
+    decay = 1 - 2 / (span + 1)
+    out = np.full(x.shape, np.nan)
+    num = np.zeros(x.shape[0])
+    den = np.zeros(x.shape[0])
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    for j in range(x.shape[1]):
+        num = decay * num + filled[:, j]
+        den = decay * den + valid[:, j]
+        np.divide(num, den, out=out[:, j], where=den > 0)
+    return out
+
+
+def rolling_mean(x, window):
+    valid = ~np.isnan(x)
+    sums = np.zeros((x.shape[0], x.shape[1] + 1))
+    counts = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(np.where(valid, x, 0.0), axis=1, out=sums[:, 1:])
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window: return out
+    s = sums[:, window:] - sums[:, :-window]
+    c = counts[:, window:] - counts[:, :-window]
+    out[:, window - 1:] = np.where(c == window, s / window, np.nan)
+    return out
+
+
+def rsi(close, period=14):
+    # Như pandas: delta.where(delta > 0, 0) coi phiên đầu tiên (delta NaN) là 0
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    missing = np.isnan(close)
+    gain[missing] = np.nan
+    loss[missing] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = rolling_mean(gain, period) / rolling_mean(loss, period)
+        return 100 - (100 / (1 + rs))
+
+
+def compute_indicators(close, volume):
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    macd = ewm_mean(close, 12) - ewm_mean(close, 26)
+    vol_ma20 = rolling_mean(volume, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vol_ratio = volume / vol_ma20
+    return {
+        'EMA_20': ewm_mean(close, 20),
+        'MA_20': rolling_mean(close, 20),
+        'MA_50': rolling_mean(close, 50),
+        'RSI': rsi(close),
+        'MACD': macd,
+        'MACD_Signal': ewm_mean(macd, 9),
+        'Vol_MA20': vol_ma20,
+        'Vol_Ratio': vol_ratio,
+    }
+
+
+def last_values(indicators):
+    return {name: arr[:, -1] for name, arr in indicators.items()}
+
+
+def add_indicators(df):
+    # Bản một mã cho trang phân tích: thêm cột chỉ báo vào DataFrame
+    ind = compute_indicators(df['Close'].to_numpy(dtype=float)[None, :], df['Volume'].to_numpy(dtype=float)[None, :])
+    for name, arr in ind.items(): df[name] = arr[0]
+    return df
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from core.config import DATA_DIR
+from core.metrics import timed_request
+
+# =============================================================================
+# LLM: BACKEND CẮM RỜI + BỘ ĐỆM THEO NỘI DUNG PROMPT (TTL/LRU TRÊN ĐĨA)
+# =============================================================================
+MODEL_NAME = 'gemini-3.6-flash'
+
+
+class GeminiBackend:
+    def __init__(self, api_key, model_name=MODEL_NAME):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        with timed_request('gemini') as req:
+            text = self.model.generate_content(prompt).text
+            req['bytes'] = len(text.encode())
+        return text
+
+    def stream(self, prompt):
+        # Độ trễ tính đến đoạn cuối cùng; người gọi bỏ ngang thì ghi trạng thái 'aborted'
+        with timed_request('gemini') as req:
+            req['status'] = 'aborted'
+            for chunk in self.model.generate_content(prompt, stream=True):
+                if chunk.text:
+                    req['bytes'] += len(chunk.text.encode())
+                    yield chunk.text
+            req['status'] = 'ok'
+
+
+class LLMCache:
+    def __init__(self, root=DATA_DIR / 'llm', ttl=6 * 3600, max_entries=500):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name, prompt):
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        path = self.root / f"{key}.json"
+        try:
+            with open(path, encoding='utf-8') as f: entry = json.load(f)
+        except (OSError, ValueError): return None
+        if time.time() - entry['at'] > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # mtime = lần dùng gần nhất, phục vụ loại bỏ LRU
+        return entry['text']
+
+    def put(self, key, text):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{key}.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f: json.dump({'text': text, 'at': time.time()}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        with self._lock:
+            files = sorted(self.root.glob('*.json'), key=lambda p: p.stat().st_mtime)
+            for old in files[:max(0, len(files) - self.max_entries)]: old.unlink(missing_ok=True)
+
+
+class CachedLLM:
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache if cache is not None else LLMCache()
+
+    def _key(self, prompt):
+        return self.cache.key(getattr(self.backend, 'name', type(self.backend).__name__), prompt)
+
+    def generate(self, prompt):
+        key = self._key(prompt)
+        text = self.cache.get(key)
+        if text is None:
+            text = self.backend.generate(prompt)
+            self.cache.put(key, text)
+        return text
+
+    def stream(self, prompt):
+        # Trúng đệm thì trả nguyên văn một lần; trượt thì phát từng đoạn và lưu khi đủ
+        key = self._key(prompt)
+        text = self.cache.get(key)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for chunk in self.backend.stream(prompt):
+            parts.append(chunk)
+            yield chunk
+        self.cache.put(key, "".join(parts))
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_llm(api_key, model_name=MODEL_NAME):
+    # Mỗi tiến trình chỉ dựng client Gemini một lần cho mỗi API key
+    with _clients_lock:
+        if (api_key, model_name) not in _clients:
+            _clients[(api_key, model_name)] = CachedLLM(GeminiBackend(api_key, model_name))
+        return _clients[(api_key, model_name)]
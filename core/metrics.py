@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================================================================
+# ĐO LƯỜNG: ĐỘ TRỄ / LỖI / RETRY / BYTE THEO NGUỒN DỮ LIỆU VÀ THEO CÔNG ĐOẠN
+# =============================================================================
+# Chỉ số sống trong tiến trình (dùng chung mọi phiên Streamlit). Mỗi lần ghi chỉ là
+# vài phép cộng dưới một khóa nên không đáng kể so với một request mạng.
+# Đặt WOLF_METRICS_PORT để mở /metrics cho Prometheus; mỗi tiến trình cần một cổng riêng
+# (vd. Streamlit 9101, python -m core eod 9102), tiến trình đến sau không mở được sẽ ghi lỗi.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+HELP = {
+    'wolf_upstream_request_seconds': ('histogram', "Độ trễ mỗi lần gọi nguồn dữ liệu ngoài"),
+    'wolf_upstream_requests_total': ('counter', "Số lần gọi nguồn ngoài theo trạng thái"),
+    'wolf_upstream_retries_total': ('counter', "Số lần thử lại khi gọi nguồn ngoài"),
+    'wolf_upstream_bytes_total': ('counter', "Số byte nhận từ nguồn ngoài"),
+    'wolf_stage_seconds': ('histogram', "Thời gian từng công đoạn xử lý"),
+    'wolf_errors_total': ('counter', "Lỗi bị nuốt và thay bằng giá trị mặc định"),
+    'wolf_cache_events_total': ('counter', "Sự kiện bộ đệm dùng chung"),
+    'wolf_cache_entries': ('gauge', "Số mục đang nằm trong bộ đệm"),
+}
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Ước lượng nội suy tuyến tính trong bucket, như histogram_quantile của Prometheus
+        if not self.count: return float('nan')
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock: self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None: hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+            hists = {k: (list(h.counts), h.sum, h.count, h.quantile(0.5), h.quantile(0.95)) for k, h in self.histograms.items()}
+        return counters, hists
+
+
+registry = Registry()
+
+
+def record_request(upstream, seconds, status, nbytes=0):
+    registry.observe('wolf_upstream_request_seconds', seconds, upstream=upstream)
+    registry.inc('wolf_upstream_requests_total', upstream=upstream, status=str(status))
+    if nbytes: registry.inc('wolf_upstream_bytes_total', nbytes, upstream=upstream)
+
+
+def record_retry(upstream):
+    registry.inc('wolf_upstream_retries_total', upstream=upstream)
+
+
+def record_error(where, exc):
+    registry.inc('wolf_errors_total', where=where, error=type(exc).__name__)
+
+
+@contextmanager
+def timed_request(upstream):
+    # Ghi độ trễ + trạng thái 'ok' hoặc tên lỗi; gán ctx['bytes'] để cộng số byte
+    ctx = {'bytes': 0, 'status': 'ok'}
+    start = time.perf_counter()
+    try: yield ctx
+    except Exception as e:
+        ctx['status'] = type(e).__name__
+        raise
+    finally: record_request(upstream, time.perf_counter() - start, ctx['status'], ctx['bytes'])
+
+
+@contextmanager
+def timed_stage(stage):
+    start = time.perf_counter()
+    try: yield
+    finally: registry.observe('wolf_stage_seconds', time.perf_counter() - start, stage=stage)
+
+
+def stage_rows():
+    # Bảng tóm tắt cho trang chẩn đoán: mỗi dòng một nguồn ngoài hoặc một công đoạn
+    counters, hists = registry.snapshot()
+    rows = []
+    for (name, labels), (_, total, count, p50, p95) in sorted(hists.items()):
+        labels = dict(labels)
+        row = {'Loại': 'Nguồn ngoài' if name == 'wolf_upstream_request_seconds' else 'Công đoạn',
+               'Tên': labels.get('upstream') or labels.get('stage'), 'Số lần': count,
+               'TB (ms)': total / count * 1000, 'p50 (ms)': p50 * 1000, 'p95 (ms)': p95 * 1000}
+        if 'upstream' in labels:
+            up = labels['upstream']
+            statuses = {dict(l)['status']: v for (n, l), v in counters.items() if n == 'wolf_upstream_requests_total' and dict(l)['upstream'] == up}
+            row['Lỗi'] = sum(v for s, v in statuses.items() if s not in ('ok', 'aborted') and not s.startswith('2'))
+            row['Retry'] = counters.get(('wolf_upstream_retries_total', (('upstream', up),)), 0)
+            row['KB nhận'] = counters.get(('wolf_upstream_bytes_total', (('upstream', up),)), 0) / 1024
+        rows.append(row)
+    return rows
+
+
+def _fmt_labels(labels):
+    esc = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}" if labels else ""
+
+
+def render_prometheus():
+    from core.cache import cache_stats
+    counters, hists = registry.snapshot()
+    for c in cache_stats():
+        for event in ('hits', 'misses', 'evictions', 'coalesced', 'errors'):
+            counters[('wolf_cache_events_total', (('cache', c['name']), ('event', event)))] = c[event]
+        counters[('wolf_cache_entries', (('cache', c['name']),))] = c['size']
+    lines, seen = [], set()
+
+    def header(name):
+        if name in seen: return
+        seen.add(name)
+        kind, text = HELP.get(name, ('untyped', name))
+        lines.extend([f"# HELP {name} {text}", f"# TYPE {name} {kind}"])
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name)
+        lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    for (name, labels), (counts, total, count, _, _) in sorted(hists.items()):
+        header(name)
+        cumulative = 0
+        for bound, c in zip(list(BUCKETS) + ['+Inf'], counts):
+            cumulative += c
+            lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+exporter = None
+exporter_error = None
+_exporter_lock = threading.Lock()
+
+def start_exporter(port=None):
+    # Endpoint /metrics cho Prometheus khi đặt WOLF_METRICS_PORT; mỗi tiến trình mở một lần.
+    # Mỗi tiến trình (Streamlit, python -m core eod, ...) cần cổng riêng: cổng đã bị chiếm thì
+    # ghi lỗi vào wolf_errors_total và exporter_error thay vì làm hỏng trang/job đang chạy
+    global exporter, exporter_error
+    port = port or os.environ.get('WOLF_METRICS_PORT')
+    if not port: return None
+    with _exporter_lock:
+        if exporter is not None or exporter_error is not None: return exporter
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): pass
+
+        try: exporter = ThreadingHTTPServer(('0.0.0.0', int(port)), Handler)
+        except (OSError, ValueError) as e:
+            exporter_error = f"cổng {port}: {e}"
+            record_error('metrics.exporter', e)
+            return None
+        threading.Thread(target=exporter.serve_forever, daemon=True).start()
+        return exporter
+
+
+# Mở ngay khi tiến trình nạp module này lần đầu (mọi trang và lệnh CLI đều nạp nó),
+# không đợi ai mở trang Chẩn đoán
+start_exporter()
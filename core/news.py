@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cache import get_cache, make_backend
+from core.metrics import record_error, timed_request
+
+# =============================================================================
+# TIN TỨC: BỘ ĐỆM THEO MÃ (CÓ TTL, LƯU SQLITE) + LUỒNG NỀN TẢI TRƯỚC
+# =============================================================================
+
+
+class GoogleNewsProvider:
+    def search(self, ticker, limit=5):
+        from GoogleNews import GoogleNews
+        googlenews = GoogleNews(lang='vi', region='VN', period='7d')
+        with timed_request('googlenews'):
+            googlenews.search(f"Cổ phiếu {ticker}")
+        return [{'title': r['title'], 'date': r['date']} for r in googlenews.result()[:limit]]
+
+
+class NewsService:
+    def __init__(self, provider=None, cache=None, max_workers=4, limit=5):
+        self.provider = provider or GoogleNewsProvider()
+        self.cache = cache if cache is not None else get_cache('news', ttl=3600, max_entries=5000, backend=make_backend('news', 5000, 'sqlite'))
+        self.limit = limit
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news')
+
+    def get(self, ticker):
+        # Trả về danh sách tin (có thể rỗng); lỗi nguồn tin được ném ra và không lưu đệm
+        ticker = ticker.upper()
+        return self.cache.get_or_load(ticker, lambda: self.provider.search(ticker, self.limit))
+
+    def fetch_async(self, ticker):
+        # Future chứa tin đã định dạng cho prompt; lỗi nguồn tin nằm trong Future
+        return self.pool.submit(lambda: format_stories(self.get(ticker)))
+
+    def prefetch(self, tickers):
+        # {mã: Future} chạy trên pool nền để giao diện không phải chờ
+        return {t: self.pool.submit(self.get, t) for t in dict.fromkeys(tickers)}
+
+
+def latest_headline(future_or_items):
+    try:
+        items = future_or_items.result() if hasattr(future_or_items, 'result') else future_or_items
+        return items[0]['title'] if items else "Chưa có tin hot"
+    except Exception as e:
+        record_error('latest_headline', e)
+        return "Theo dòng tiền"
+
+
+def format_stories(items):
+    if not items: return "Không tìm thấy câu chuyện riêng đáng chú ý trong tuần qua."
+    return "\n".join(f"- {res['title']} ({res['date']})" for res in items)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_news_service():
+    global _default
+    with _default_lock:
+        if _default is None: _default = NewsService()
+        return _default
@@ -0,0 +1,23 @@
+from core.cache import get_cache
+from core.fetcher import get_fetcher
+from core.store import get_store
+
+# =============================================================================
+# GIÁ HIỆN TẠI THEO LÔ + BỘ ĐỆM BÁO GIÁ DÙNG CHUNG
+# =============================================================================
+quote_cache = get_cache('quotes', ttl=30, max_entries=2000)
+
+
+def _last_close(store, ticker):
+    df = store.load(ticker, days=7)
+    if df is None or not len(df): raise LookupError(f"{ticker}: không có dữ liệu giá")
+    return float(df['Close'].iloc[-1])
+
+
+def get_current_prices(tickers, store=None):
+    # Trả về {mã: giá}; mã trùng chỉ tải một lần, trượt đệm thì tải song song và gộp với
+    # các phiên khác đang hỏi cùng mã; mã lỗi trả 0
+    store = store or get_store()
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if isinstance(t, str) and t.strip()))
+    prices = (store.fetcher or get_fetcher()).run_many(lambda t: quote_cache.get_or_load(t, lambda: _last_close(store, t)), symbols)
+    return {t: prices.get(t, 0) for t in symbols}
@@ -0,0 +1,129 @@
+import os
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from core.bars import BarPanel
+from core.config import DATA_DIR
+from core.metrics import timed_stage
+from core.screening import build_snapshot
+from core.store import get_store
+from core.streaming import StateBook
+from core.universe import WATCHLIST_FULL, WATCHLIST_QUICK
+
+# =============================================================================
+# QUÉT TOÀN THỊ TRƯỜNG KHÔNG GIAO DIỆN + ẢNH CHỤP BẢNG SÀNG LỌC TRÊN ĐĨA
+# =============================================================================
+UNIVERSES = {'quick': WATCHLIST_QUICK, 'full': sorted(WATCHLIST_FULL)}
+SNAPSHOT_DIR = DATA_DIR / 'snapshots'
+SNAPSHOT_MAX_AGE = 1800  # giây, trong giờ giao dịch
+MARKET_TZ = ZoneInfo('Asia/Ho_Chi_Minh')
+SESSION_OPEN, SESSION_CLOSE = dtime(9, 0), dtime(15, 0)
+SNAPSHOT_DTYPES = {'Giá': np.float32, '% Đổi': np.float32, 'RSI': np.float32, 'Trên MA50': bool, 'MACD Khỏe': bool,
+                   'Vol Ratio': np.float32, 'Vol_MA20': np.float32, 'GTGD': np.float32, 'Gom gần nhất': np.float32}
+
+try:
+    import pyarrow  # noqa: F401
+    SNAPSHOT_EXT = '.parquet'
+except ImportError:
+    SNAPSHOT_EXT = '.csv'
+
+
+PANEL_DIR = DATA_DIR / 'panels'
+
+
+def build_panel(universe='full', days=90, store=None, on_done=None):
+    bars = (store or get_store()).sync_many(UNIVERSES[universe], days=days, on_done=on_done)
+    return BarPanel.from_bars(bars, start_ts=int((datetime.now() - timedelta(days=days)).timestamp()))
+
+
+def run_scan(universe='full', days=90, store=None, on_done=None):
+    with timed_stage('scan.sync'): panel = build_panel(universe, days, store, on_done)
+    with timed_stage('scan.snapshot'): return build_snapshot(panel)
+
+
+def save_snapshot(snap, universe, root=SNAPSHOT_DIR, built_at=None):
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    built_at = built_at or datetime.now(MARKET_TZ)
+    path = root / f"{universe}-{built_at:%Y%m%d-%H%M%S}{SNAPSHOT_EXT}"
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    if SNAPSHOT_EXT == '.parquet': snap.to_parquet(tmp, index=False)
+    else: snap.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def latest_snapshot_path(universe, root=SNAPSHOT_DIR):
+    paths = sorted(Path(root).glob(f"{universe}-*{SNAPSHOT_EXT}"))
+    return paths[-1] if paths else None
+
+
+def snapshot_time(path):
+    return datetime.strptime(path.stem.split('-', 1)[1], '%Y%m%d-%H%M%S').replace(tzinfo=MARKET_TZ)
+
+
+def load_snapshot(path):
+    snap = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+    return snap.astype({k: v for k, v in SNAPSHOT_DTYPES.items() if k in snap})
+
+
+def last_session_close(now):
+    day = now.date() if now.time() >= SESSION_CLOSE else now.date() - timedelta(days=1)
+    while day.weekday() >= 5: day -= timedelta(days=1)
+    return datetime.combine(day, SESSION_CLOSE, tzinfo=MARKET_TZ)
+
+
+def in_session(now):
+    return now.weekday() < 5 and SESSION_OPEN <= now.time() < SESSION_CLOSE
+
+
+def is_fresh(built_at, now=None):
+    # Trong phiên: còn mới nếu chưa quá SNAPSHOT_MAX_AGE; ngoài phiên: chụp sau phiên đóng cửa gần nhất
+    now = now or datetime.now(MARKET_TZ)
+    if in_session(now): return (now - built_at).total_seconds() < SNAPSHOT_MAX_AGE
+    return built_at >= last_session_close(now)
+
+
+def load_latest_snapshot(universe, root=SNAPSHOT_DIR, fresh_only=True):
+    # (bảng, thời điểm chụp) hoặc None nếu chưa có / đã cũ
+    path = latest_snapshot_path(universe, root)
+    if path is None: return None
+    built_at = snapshot_time(path)
+    if fresh_only and not is_fresh(built_at): return None
+    return load_snapshot(path), built_at
+
+
+def prune_snapshots(universe, keep=10, root=SNAPSHOT_DIR):
+    for old in sorted(Path(root).glob(f"{universe}-*{SNAPSHOT_EXT}"))[:-keep]: old.unlink(missing_ok=True)
+
+
+def end_of_day(universes=('quick', 'full'), store=None, keep=10):
+    # Đồng bộ kho, tiến trạng thái chỉ báo từng nến, chụp bảng sàng lọc cho từng vùng mã
+    store = store or get_store()
+    book = StateBook()
+    paths = []
+    for universe in universes:
+        # Khối nến đủ lịch sử, lưu lại cho backtest (đọc bằng mmap)
+        with timed_stage('scan.sync'): panel = build_panel(universe, days=store.history_days, store=store)
+        # Kho trống (mọi mã tải lỗi, chưa có dữ liệu trên đĩa): giữ nguyên ảnh chụp cũ thay vì ghi bảng rỗng
+        if not len(panel): continue
+        panel.save(PANEL_DIR / universe)
+        # Chỉ báo lấy từ trạng thái tăng dần: mỗi mã chỉ cộng các nến mới thay vì tính lại cả lịch sử
+        with timed_stage('scan.state'): latest = book.refresh(store, panel.tickers)
+        with timed_stage('scan.snapshot'): snap = build_snapshot(panel, latest=latest)
+        paths.append(save_snapshot(snap, universe))
+        prune_snapshots(universe, keep)
+    book.save()
+    return paths
+
+
+def next_run(now, at=SESSION_CLOSE):
+    # Lần chạy kế tiếp: ngày làm việc gần nhất, sau giờ 'at'
+    run = datetime.combine(now.date(), at, tzinfo=MARKET_TZ)
+    if run <= now: run += timedelta(days=1)
+    while run.weekday() >= 5: run += timedelta(days=1)
+    return run
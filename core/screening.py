@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from core.bars import CLOSE, HIGH, LOW, OPEN
+from core.indicators import compute_indicators, last_values
+from core.signals import SIGNAL_ACCUMULATION, bars_since, vsa_panel
+
+# =============================================================================
+# BẢNG SÀNG LỌC DỰNG SẴN: MỖI MÃ MỘT DÒNG, LỌC BẰNG MẶT NẠ VECTOR
+# =============================================================================
+MIN_BARS = 50
+MIN_LIQUIDITY = 50000
+VOL_SPIKE = 1.3
+SORT_COLUMNS = ['% Đổi', 'RSI', 'Vol Ratio', 'Giá', 'Vol_MA20', 'GTGD', 'Gom gần nhất']
+SORT_ASCENDING = {'Gom gần nhất'}  # cột mà giá trị nhỏ là tốt (vào hàng gần nhất lên đầu)
+
+
+def build_snapshot(panel, min_bars=MIN_BARS, latest=None):
+    # panel: BarPanel của cả vùng mã; chỉ báo tính trên chuỗi đã căn phải của từng mã,
+    # hoặc lấy sẵn từ latest ({mã: giá trị chỉ báo}, vd. StateBook.refresh) nếu có
+    panel = panel.subset(panel.bar_counts() >= min_bars)
+    if not len(panel): return pd.DataFrame(columns=['Mã CK', 'Giá', '% Đổi', 'RSI', 'Trên MA50', 'MACD Khỏe', 'Vol Ratio', 'Vol_MA20', 'GTGD', 'Gom gần nhất'])
+    tickers = panel.tickers
+    ohlc, volume = panel.right_aligned()
+    close = ohlc[:, :, CLOSE]
+    if latest is None: last = last_values(compute_indicators(close, volume))
+    else: last = {k: np.array([latest[t][k] for t in tickers], dtype=float) for k in ('RSI', 'MA_50', 'MACD', 'MACD_Signal', 'Vol_MA20')}
+    signals = vsa_panel(ohlc[:, :, OPEN], ohlc[:, :, HIGH], ohlc[:, :, LOW], close, volume)
+    last_close, prev_close = close[:, -1], close[:, -2]
+    vol_ma20 = last['Vol_MA20']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vol_ratio = np.where(vol_ma20 > 0, volume[:, -1] / vol_ma20, 0)
+        change_pct = (last_close - prev_close) / prev_close * 100
+    return pd.DataFrame({
+        'Mã CK': tickers,
+        'Giá': last_close.astype(np.float32),
+        '% Đổi': change_pct.astype(np.float32),
+        'RSI': last['RSI'].astype(np.float32),
+        'Trên MA50': ~(last_close < last['MA_50']),
+        'MACD Khỏe': ~(last['MACD'] < last['MACD_Signal']),
+        'Vol Ratio': vol_ratio.astype(np.float32),
+        'Vol_MA20': vol_ma20.astype(np.float32),
+        'GTGD': (last_close * vol_ma20).astype(np.float32),  # thanh khoản bình quân theo giá trị
+        'Gom gần nhất': bars_since(signals, SIGNAL_ACCUMULATION).astype(np.float32),  # số phiên kể từ lần cá mập vào hàng gần nhất
+    })
+
+
+def query_snapshot(snap, rsi_min, rsi_max, use_macd, use_ma50, sort_by='% Đổi', ascending=None, top_n=None, min_liquidity=MIN_LIQUIDITY, accumulation_days=None):
+    mask = ~(snap['Vol_MA20'] < min_liquidity) & snap['RSI'].between(rsi_min, rsi_max)
+    if use_ma50: mask &= snap['Trên MA50']
+    if use_macd: mask &= snap['MACD Khỏe']
+    if not (use_ma50 or use_macd): mask &= snap['Vol Ratio'] > VOL_SPIKE
+    if accumulation_days: mask &= snap['Gom gần nhất'] < accumulation_days
+    if ascending is None: ascending = sort_by in SORT_ASCENDING
+    res = snap[mask].sort_values(sort_by, ascending=ascending)
+    if top_n: res = res.head(top_n)
+    return res.reset_index(drop=True)
+
+
+def to_display(res, use_macd, use_ma50, accumulation_days=None):
+    # Định dạng giống bảng Radar: làm tròn, ghép nhãn mô hình
+    tags = pd.Series("", index=res.index)
+    if use_ma50: tags += " + Trend MA50"
+    if use_macd: tags += " + MACD Khỏe"
+    if accumulation_days: tags += " + Cá Mập Gom"
+    tags = tags.where(~(res['Vol Ratio'] > VOL_SPIKE), tags + " + Nổ Vol").str.removeprefix(" + ")
+    return pd.DataFrame({
+        'Mã CK': res['Mã CK'],
+        'Giá': res['Giá'].astype(float).round(2),
+        '% Đổi': res['% Đổi'].astype(float).round(2),
+        'RSI': res['RSI'].astype(float).round(1),
+        'Vol Ratio': res['Vol Ratio'].astype(float).round(1).map("{}x".format),
+        'Mô hình': tags.replace("", "Đạt chuẩn"),
+    })
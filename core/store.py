@@ -0,0 +1,147 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.cache import get_cache
+from core.config import DATA_DIR
+from core.fetcher import get_fetcher
+from core.metrics import record_error
+
+# =============================================================================
+# KHO NẾN NGÀY TRÊN ĐĨA (MỖI MÃ MỘT FILE .NPY, ĐỒNG BỘ PHẦN CHÊNH LỆCH)
+# =============================================================================
+# Khung thời gian dchart hỗ trợ -> số ngày lịch sử giữ trong kho. Một chính sách chung:
+# mỗi file giữ tối đa BAR_BUDGET nến và không quá một năm, nên khung càng nhỏ càng ít ngày
+# (D/60/15 phút: 365 ngày, 5 phút: 165, 1 phút: 33)
+SESSION_MINUTES = 255  # HOSE: 9:00-11:30 và 13:00-14:45
+BAR_BUDGET = 6000
+MAX_HISTORY_DAYS = 365
+
+
+def history_days(resolution):
+    bars_per_session = 1 if resolution == 'D' else math.ceil(SESSION_MINUTES / int(resolution))
+    # Đổi số phiên ra ngày lịch (5 phiên mỗi 7 ngày)
+    return min(MAX_HISTORY_DAYS, math.ceil(BAR_BUDGET / bars_per_session * 7 / 5))
+
+
+RESOLUTIONS = {r: history_days(r) for r in ('D', '60', '15', '5', '1')}
+BAR_DTYPE = np.dtype([('t', '<i8'), ('o', '<f8'), ('h', '<f8'), ('l', '<f8'), ('c', '<f8'), ('v', '<i8')])
+
+
+def bars_from_json(data):
+    bars = np.empty(len(data['t']), dtype=BAR_DTYPE)
+    for field, key in (('t', 't'), ('o', 'o'), ('h', 'h'), ('l', 'l'), ('c', 'c'), ('v', 'v')):
+        bars[field] = data[key]
+    return bars
+
+
+def bars_to_frame(bars, local_time=False):
+    dates = pd.to_datetime(bars['t'], unit='s')
+    # Nến trong phiên hiển thị theo giờ Việt Nam
+    if local_time: dates = dates.tz_localize('UTC').tz_convert('Asia/Ho_Chi_Minh').tz_localize(None)
+    return pd.DataFrame({'Date': dates, 'Open': bars['o'], 'High': bars['h'], 'Low': bars['l'], 'Close': bars['c'], 'Volume': bars['v']})
+
+
+class BarStore:
+    def __init__(self, root=DATA_DIR, resolution='D', fetcher=None, max_age=60, history_days=None, cache=None):
+        self.root = Path(root) / 'bars' / resolution
+        self.resolution = resolution
+        self.fetcher = fetcher
+        self.max_age = max_age  # giây: file vừa đồng bộ thì không gọi mạng lại
+        self.history_days = history_days or RESOLUTIONS[resolution]
+        # Đệm trong bộ nhớ trước file: các phiên cùng hỏi một mã chỉ đồng bộ một lần
+        self.cache = cache if cache is not None else get_cache(f"bars-{resolution}", ttl=max_age, max_entries=1000)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, ticker):
+        return self.root / f"{ticker.upper()}.npy"
+
+    def coverage_path(self, ticker):
+        # Mốc bắt đầu đã yêu cầu tải (không phải nến đầu tiên: mã mới niêm yết/tạm ngừng đầu kỳ)
+        return self.root / f"{ticker.upper()}.from"
+
+    def coverage(self, ticker):
+        try: return int(self.coverage_path(ticker).read_text())
+        except (OSError, ValueError): return None
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def read(self, ticker, mmap=True):
+        path = self.path(ticker)
+        if not path.exists(): return None
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def write(self, ticker, bars):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(ticker)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'wb') as f: np.save(f, np.ascontiguousarray(bars, dtype=BAR_DTYPE))
+        os.replace(tmp, path)
+
+    def write_coverage(self, ticker, from_ts):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.coverage_path(ticker)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(str(int(from_ts)))
+        os.replace(tmp, path)
+
+    def sync(self, ticker, days=None):
+        # Chỉ tải các nến từ mốc cuối đã lưu (tải lại nến cuối vì phiên hôm nay có thể chưa đóng)
+        ticker = ticker.upper()
+        days = max(days or 0, self.history_days)
+        with self._lock(ticker):
+            path = self.path(ticker)
+            stored = self.read(ticker, mmap=False)
+            if stored is not None and time.time() - path.stat().st_mtime < self.max_age: return stored
+            now = datetime.now()
+            start_ts = int((now - timedelta(days=days)).timestamp())
+            # Kho cũ chưa có file mốc thì suy từ nến đầu tiên
+            covered_from = self.coverage(ticker)
+            if covered_from is None and stored is not None and len(stored): covered_from = int(stored['t'][0])
+            covered = stored is not None and len(stored) and covered_from is not None and covered_from <= start_ts + 10 * 86400
+            from_ts = int(stored['t'][-1]) if covered else start_ts
+            data = (self.fetcher or get_fetcher()).fetch_raw(ticker, from_ts, int(now.timestamp()), self.resolution)
+            if data.get('s') != 'ok' or not data.get('t'):
+                if stored is not None: os.utime(path)
+                return stored
+            fresh = bars_from_json(data)
+            if stored is not None: fresh = np.concatenate([stored[stored['t'] < fresh['t'][0]], fresh])
+            self.write(ticker, fresh)
+            if not covered: self.write_coverage(ticker, start_ts)
+            return fresh
+
+    def bars(self, ticker, days):
+        # Mảng nến đã đồng bộ (qua bộ đệm dùng chung); lỗi mạng thì dùng bản trên đĩa
+        key = f"{ticker.upper()}:{max(days, self.history_days)}"
+        try: return self.cache.get_or_load(key, lambda: self.sync(ticker, days))
+        except Exception as e:
+            record_error('store.bars', e)
+            return self.read(ticker)
+
+    def load(self, ticker, days):
+        bars = self.bars(ticker, days)
+        if bars is None or not len(bars): return None
+        start_ts = int((datetime.now() - timedelta(days=days)).timestamp())
+        return bars_to_frame(bars[bars['t'] >= start_ts], local_time=self.resolution != 'D')
+
+    def sync_many(self, tickers, days, on_done=None):
+        # Đồng bộ song song, trả mảng nến thô của từng mã (không dựng DataFrame)
+        return (self.fetcher or get_fetcher()).run_many(lambda t: self.bars(t, days), tickers, on_done)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(resolution='D'):
+    # Một kho cho mỗi khung thời gian, dùng chung cả tiến trình
+    with _stores_lock:
+        if resolution not in _stores: _stores[resolution] = BarStore(resolution=resolution)
+        return _stores[resolution]
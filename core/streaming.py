@@ -0,0 +1,170 @@
+import copy
+import json
+import math
+import os
+import threading
+from pathlib import Path
+
+from core.config import DATA_DIR
+
+# =============================================================================
+# CHỈ BÁO CẬP NHẬT TỪNG NẾN (O(1) MỖI PHIÊN MỚI)
+# =============================================================================
+# Khớp với bản vector hóa trong core/indicators.py (và pandas) khi chạy trên cùng lịch sử.
+
+
+class RollingSum:
+    # Bộ đệm vòng có tổng chạy; cộng lại chính xác mỗi vòng để chặn sai số tích lũy
+    def __init__(self, window):
+        self.window = window
+        self.buf = []
+        self.pos = 0
+        self.total = 0.0
+
+    def push(self, value):
+        if len(self.buf) < self.window:
+            self.buf.append(value)
+            self.total += value
+            return
+        self.total += value - self.buf[self.pos]
+        self.buf[self.pos] = value
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0: self.total = math.fsum(self.buf)
+
+    def mean(self):
+        return self.total / self.window if len(self.buf) == self.window else math.nan
+
+    def to_dict(self):
+        return {'window': self.window, 'buf': self.buf, 'pos': self.pos}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d['window'])
+        obj.buf, obj.pos = list(d['buf']), d['pos']
+        obj.total = math.fsum(obj.buf)
+        return obj
+
+
+class Ema:
+    # EMA dạng adjust=True của pandas: tổng trọng số tử/mẫu
+    def __init__(self, span):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def push(self, value):
+        self.num = self.decay * self.num + value
+        self.den = self.decay * self.den + 1
+        return self.value()
+
+    def value(self):
+        return self.num / self.den if self.den else math.nan
+
+    def to_dict(self):
+        return {'span': self.span, 'num': self.num, 'den': self.den}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d['span'])
+        obj.num, obj.den = d['num'], d['den']
+        return obj
+
+
+class IncrementalIndicators:
+    def __init__(self):
+        self.last_t = None
+        self.prev_close = None
+        self.close = math.nan
+        self.volume = math.nan
+        self.ema = {span: Ema(span) for span in (12, 20, 26)}
+        self.signal = Ema(9)
+        self.ma = {20: RollingSum(20), 50: RollingSum(50)}
+        self.gain = RollingSum(14)
+        self.loss = RollingSum(14)
+        self.vol_ma = RollingSum(20)
+
+    def update(self, t, close, volume):
+        if self.last_t is not None and t <= self.last_t: return self.values()
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.gain.push(max(delta, 0.0))
+        self.loss.push(max(-delta, 0.0))
+        for ema in self.ema.values(): ema.push(close)
+        self.signal.push(self.ema[12].value() - self.ema[26].value())
+        for ma in self.ma.values(): ma.push(close)
+        self.vol_ma.push(volume)
+        self.last_t, self.prev_close, self.close, self.volume = t, close, close, volume
+        return self.values()
+
+    def preview(self, t, close, volume):
+        # Giá trị nếu nến (chưa đóng) này được cộng vào, không làm đổi trạng thái
+        return copy.deepcopy(self).update(t, close, volume)
+
+    def values(self):
+        gain, loss = self.gain.mean(), self.loss.mean()
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0): rsi = math.nan
+        elif loss == 0: rsi = 100.0
+        else: rsi = 100 - 100 / (1 + gain / loss)
+        vol_ma20 = self.vol_ma.mean()
+        macd = self.ema[12].value() - self.ema[26].value()
+        return {
+            'EMA_20': self.ema[20].value(),
+            'MA_20': self.ma[20].mean(),
+            'MA_50': self.ma[50].mean(),
+            'RSI': rsi,
+            'MACD': macd,
+            'MACD_Signal': self.signal.value(),
+            'Vol_MA20': vol_ma20,
+            'Vol_Ratio': self.volume / vol_ma20 if vol_ma20 else math.nan,
+        }
+
+    def to_dict(self):
+        return {
+            'last_t': self.last_t, 'prev_close': self.prev_close, 'close': self.close, 'volume': self.volume,
+            'ema': [e.to_dict() for e in self.ema.values()], 'signal': self.signal.to_dict(),
+            'ma': [m.to_dict() for m in self.ma.values()],
+            'gain': self.gain.to_dict(), 'loss': self.loss.to_dict(), 'vol_ma': self.vol_ma.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls()
+        obj.last_t, obj.prev_close, obj.close, obj.volume = d['last_t'], d['prev_close'], d['close'], d['volume']
+        obj.ema = {e['span']: Ema.from_dict(e) for e in d['ema']}
+        obj.signal = Ema.from_dict(d['signal'])
+        obj.ma = {m['window']: RollingSum.from_dict(m) for m in d['ma']}
+        obj.gain, obj.loss, obj.vol_ma = (RollingSum.from_dict(d[k]) for k in ('gain', 'loss', 'vol_ma'))
+        return obj
+
+
+class StateBook:
+    # Trạng thái chỉ báo của cả thị trường, lưu một file JSON trên đĩa
+    def __init__(self, path=DATA_DIR / 'state' / 'indicators.json'):
+        self.path = Path(path)
+        self.states = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                self.states = {t: IncrementalIndicators.from_dict(d) for t, d in json.load(f).items()}
+
+    def advance(self, ticker, bars):
+        # bars: mảng nến của kho (trường t/c/v); nến cuối có thể chưa đóng nên chỉ xem trước
+        with self._lock:
+            state = self.states.setdefault(ticker.upper(), IncrementalIndicators())
+        if bars is None or not len(bars): return state.values()
+        last_t = state.last_t if state.last_t is not None else -1
+        for bar in bars[:-1][bars['t'][:-1] > last_t]:
+            state.update(int(bar['t']), float(bar['c']), float(bar['v']))
+        tail = bars[-1]
+        if int(tail['t']) <= last_t: return state.values()
+        return state.preview(int(tail['t']), float(tail['c']), float(tail['v']))
+
+    def refresh(self, store, tickers):
+        return {t.upper(): self.advance(t, store.read(t)) for t in tickers}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with self._lock, open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({t: s.to_dict() for t, s in self.states.items()}, f)
+        os.replace(tmp, self.path)
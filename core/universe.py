@@ -0,0 +1,5 @@
+# =============================================================================
+# DANH SÁCH MÃ CỦA RADAR
+# =============================================================================
+WATCHLIST_QUICK = ['SSI', 'VND', 'HCM', 'VCI', 'SHS', 'HPG', 'HSG', 'NKG', 'DIG', 'DXG', 'CEO', 'NVL', 'PDR', 'KBC', 'VHM', 'VIC', 'TCB', 'MBB', 'VPB', 'ACB', 'STB', 'CTG', 'BID', 'FPT', 'MWG', 'PNJ', 'DGC', 'VNM', 'MSN', 'GEX', 'PC1', 'VGC']
+WATCHLIST_FULL = list(set("SSI VND VCI HCM SHS MBS FTS BSI CTS VIX AGR ORS VDS BVS HPG HSG NKG VGS SMC TLH DIG DXG CEO NVL PDR KBC VHM VIC VRE NLG KDH NAM SJS HDC DPG TCH HQC SCR KHG CRE IJC NBB CII HUT LCG VCG HHV FCN C4G G36 KSB VLB DHA BCC HT1 PLC TCB MBB VPB ACB STB CTG BID VCB VIB MSB TPB OCB HDB SSB SHB EIB LPB NAB BAB FPT CMG ELC ITD DGC CSV DPM DCM BFC LAS DDV VNM MSN SAB KDC SBT QNS BAF DBC PAN TAR LTG TRC DRI DPR PHR GVR PTB SAV GIL TNG TCM VGT STK MSH GEX PC1 HDG REE POW NT2 QTP HND TV2 GEG ASM BCG TTA VSH VHC ANV IDI FMC CMX ASM CTR VGI FOX VTP HAH VOS PVT GMD PHP SGP VSC PVD PVS BSR OIL PLX GAS PVC PVB PSH PET MWG PNJ DGW FRT PET BWE TDM HAG HNG DTL VPI VCF".split()))
@@ -1,9 +1,9 @@
 import streamlit as st
-import pandas as pd
-import requests
-from datetime import datetime, timedelta
-from GoogleNews import GoogleNews
-import time
+from concurrent.futures import as_completed
+from core.metrics import timed_stage
+from core.news import get_news_service, latest_headline
+from core.scan import load_latest_snapshot, run_scan, save_snapshot, snapshot_time
+from core.screening import SORT_ASCENDING, SORT_COLUMNS, query_snapshot, to_display
 
 st.set_page_config(page_title="Wolf Screener (VNDirect Data)", layout="wide", page_icon="📡")
 st.markdown("""
@@ -14,102 +14,26 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-WATCHLIST_QUICK = ['SSI', 'VND', 'HCM', 'VCI', 'SHS', 'HPG', 'HSG', 'NKG', 'DIG', 'DXG', 'CEO', 'NVL', 'PDR', 'KBC', 'VHM', 'VIC', 'TCB', 'MBB', 'VPB', 'ACB', 'STB', 'CTG', 'BID', 'FPT', 'MWG', 'PNJ', 'DGC', 'VNM', 'MSN', 'GEX', 'PC1', 'VGC']
-WATCHLIST_FULL = list(set("SSI VND VCI HCM SHS MBS FTS BSI CTS VIX AGR ORS VDS BVS HPG HSG NKG VGS SMC TLH DIG DXG CEO NVL PDR KBC VHM VIC VRE NLG KDH NAM SJS HDC DPG TCH HQC SCR KHG CRE IJC NBB CII HUT LCG VCG HHV FCN C4G G36 KSB VLB DHA BCC HT1 PLC TCB MBB VPB ACB STB CTG BID VCB VIB MSB TPB OCB HDB SSB SHB EIB LPB NAB BAB FPT CMG ELC ITD DGC CSV DPM DCM BFC LAS DDV VNM MSN SAB KDC SBT QNS BAF DBC PAN TAR LTG TRC DRI DPR PHR GVR PTB SAV GIL TNG TCM VGT STK MSH GEX PC1 HDG REE POW NT2 QTP HND TV2 GEG ASM BCG TTA VSH VHC ANV IDI FMC CMX ASM CTR VGI FOX VTP HAH VOS PVT GMD PHP SGP VSC PVD PVS BSR OIL PLX GAS PVC PVB PSH PET MWG PNJ DGW FRT PET BWE TDM HAG HNG DTL VPI VCF".split()))
-
-def get_latest_catalyst(ticker):
-    try:
-        googlenews = GoogleNews(lang='vi', region='VN', period='7d')
-        googlenews.search(f"Cổ phiếu {ticker}")
-        res = googlenews.result()
-        if res: return res[0]['title']
-        return "Chưa có tin hot"
-    except: return "Theo dòng tiền"
-
-@st.cache_data(ttl=1800)
-def auto_scan_market(rsi_min, rsi_max, use_macd, use_ma50, scan_mode):
-    results = []
-    target_list = WATCHLIST_QUICK if scan_mode == "Nhanh (Top 30)" else WATCHLIST_FULL
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=90)
-    from_ts = int(start_date.timestamp())
-    to_ts = int(end_date.timestamp())
-    headers = {'User-Agent': 'Mozilla/5.0'}
+@st.cache_data(ttl=300)
+def build_market_snapshot(scan_mode):
+    # Ưu tiên ảnh chụp dựng sẵn (job cuối ngày hoặc phiên khác); chỉ quét khi chưa có/đã cũ
+    universe = "quick" if scan_mode == "Nhanh (Top 30)" else "full"
+    cached = load_latest_snapshot(universe)
+    if cached is not None: return cached
     
     progress_bar = st.progress(0)
-    total = len(target_list)
     status_text = st.empty()
     
-    for i, ticker in enumerate(target_list):
-        progress_bar.progress((i + 1) / total)
-        status_text.text(f"Đang quét mã {ticker} ({i+1}/{total})...")
-        try:
-            url = f"https://dchart-api.vndirect.com.vn/dchart/history?symbol={ticker}&resolution=D&from={from_ts}&to={to_ts}"
-            res = requests.get(url, headers=headers, timeout=5)
-            data = res.json()
-            
-            if data.get('s') != 'ok': continue
-            
-            df = pd.DataFrame({'Close': data['c'], 'Volume': data['v']})
-            if len(df) < 50: continue
-            
-            df['Vol_MA20'] = df['Volume'].rolling(20).mean()
-            if df['Vol_MA20'].iloc[-1] < 50000: continue
-            
-            df['MA20'] = df['Close'].rolling(20).mean()
-            df['MA50'] = df['Close'].rolling(50).mean()
-            
-            delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
-            
-            exp12 = df['Close'].ewm(span=12).mean()
-            exp26 = df['Close'].ewm(span=26).mean()
-            macd = exp12 - exp26
-            signal = macd.ewm(span=9).mean()
-            
-            last = df.iloc[-1]
-            prev = df.iloc[-2]
-            
-            if not (rsi_min <= last['RSI'] <= rsi_max): continue
-            
-            passed = True
-            tags = []
-            
-            if use_ma50:
-                if last['Close'] < last['MA50']: passed = False
-                else: tags.append("Trend MA50")
-            if use_macd:
-                if macd.iloc[-1] < signal.iloc[-1]: passed = False
-                else: tags.append("MACD Khỏe")
-            
-            vol_ratio = last['Volume'] / last['Vol_MA20'] if last['Vol_MA20'] > 0 else 0
-            if vol_ratio > 1.3: tags.append("Nổ Vol")
-            elif not (use_ma50 or use_macd): passed = False
-                
-            if passed:
-                change_pct = ((last['Close'] - prev['Close']) / prev['Close']) * 100
-                hot_story = get_latest_catalyst(ticker)
-                
-                results.append({
-                    'Mã CK': ticker,
-                    'Giá': round(last['Close'], 2),
-                    '% Đổi': round(change_pct, 2),
-                    'RSI': round(last['RSI'], 1),
-                    'Vol Ratio': f"{round(vol_ratio, 1)}x",
-                    'Mô hình': " + ".join(tags) if tags else "Đạt chuẩn",
-                    'Tin tức (Auto)': hot_story
-                })
-            time.sleep(0.1) # Tốc độ vừa đủ mượt, không làm sập server
-        except: continue
-        
+    # Đồng bộ song song kho nến trên đĩa, chỉ tải thêm các phiên mới
+    def on_done(done, total, ticker):
+        progress_bar.progress(done / total)
+        status_text.text(f"Đã tải mã {ticker} ({done}/{total})...")
+    snapshot = run_scan(universe, days=90, on_done=on_done)
+    path = save_snapshot(snapshot, universe)
+    
     status_text.empty()
     progress_bar.progress(1.0)
-    if not results: return pd.DataFrame()
-    return pd.DataFrame(results).sort_values('% Đổi', ascending=False).reset_index(drop=True)
+    return snapshot, snapshot_time(path)
 
 # =============================================================================
 # GIAO DIỆN CHÍNH
@@ -125,14 +49,38 @@ with st.sidebar:
     rsi_range = st.slider("Vùng RSI:", 20, 80, (40, 70))
     use_ma50 = st.checkbox("Nằm trên MA50 (Trend dài hạn tăng)", value=True)
     use_macd = st.checkbox("MACD cắt lên Signal (Sóng mạnh)")
+    use_accum = st.checkbox("Cá mập vào hàng gần đây (VSA)")
+    accum_days = st.slider("Trong số phiên gần nhất:", 1, 20, 5) if use_accum else None
+    
+    st.divider()
+    st.header("3. Sắp xếp")
+    sort_by = st.selectbox("Xếp theo:", SORT_COLUMNS, index=0)
+    # Mặc định theo từng cột; khóa riêng mỗi cột để đổi cột thì lấy lại mặc định
+    ascending = st.checkbox("Tăng dần", value=sort_by in SORT_ASCENDING, key=f"asc_{sort_by}")
+    top_n = st.number_input("Số mã hiển thị (0 = tất cả):", 0, 300, 0, step=5)
     
     btn_scan = st.button("🚀 KÍCH HOẠT RADAR", type="primary", use_container_width=True)
 
-if btn_scan:
+if btn_scan: st.session_state.radar_on = True
+
+if st.session_state.get('radar_on'):
     with st.spinner(f"Đang thâm nhập hệ thống lấy dữ liệu trực tiếp..."):
-        df_res = auto_scan_market(rsi_range[0], rsi_range[1], use_macd, use_ma50, scan_mode)
+        snapshot, built_at = build_market_snapshot(scan_mode)
+        st.caption(f"Dữ liệu chốt lúc {built_at:%H:%M %d/%m/%Y}")
+        with timed_stage('radar.query'):
+            res = query_snapshot(snapshot, rsi_range[0], rsi_range[1], use_macd, use_ma50, sort_by=sort_by, ascending=ascending, top_n=top_n, accumulation_days=accum_days)
+            df_res = to_display(res, use_macd, use_ma50, accum_days)
         
         if df_res.empty: st.warning("Không có cổ phiếu nào lọt vào tầm ngắm hôm nay!")
         else:
             st.success(f"🎯 Đã khóa mục tiêu {len(df_res)} siêu cổ phiếu!")
-            st.dataframe(df_res, use_container_width=True, hide_index=True)
+            # Hiện bảng ngay, tin tức được tải nền và điền dần vào
+            futures = get_news_service().prefetch(df_res['Mã CK'])
+            df_res['Tin tức (Auto)'] = "⏳ Đang tải tin..."
+            table = st.empty()
+            table.dataframe(df_res, use_container_width=True, hide_index=True)
+            rows = {fut: df_res.index[df_res['Mã CK'] == t] for t, fut in futures.items()}
+            with timed_stage('radar.news'):
+                for fut in as_completed(rows):
+                    df_res.loc[rows[fut], 'Tin tức (Auto)'] = latest_headline(fut)
+                    table.dataframe(df_res, use_container_width=True, hide_index=True)
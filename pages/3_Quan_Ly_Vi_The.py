@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-import requests
-from datetime import datetime, timedelta
+import numpy as np
+from core.metrics import timed_stage
+from core.quotes import get_current_prices
 
 # =============================================================================
 # CẤU HÌNH GIAO DIỆN
@@ -19,22 +20,17 @@ st.markdown("""
 # =============================================================================
 # HÀM LẤY GIÁ REAL-TIME
 # =============================================================================
-def get_current_price(ticker):
-    if not ticker: return 0
-    try:
-        url = f"https://dchart-api.vndirect.com.vn/dchart/history?symbol={ticker.upper()}&resolution=D&from={int((datetime.now()-timedelta(days=7)).timestamp())}&to={int(datetime.now().timestamp())}"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        res = requests.get(url, headers=headers, timeout=5).json()
-        return res['c'][-1] if res.get('s') == 'ok' else 0
-    except: return 0
-
-def get_action_recommendation(current_price, buy_price):
-    if current_price == 0 or buy_price == 0: return "⌛ Đang theo dõi..."
-    profit_pct = ((current_price - buy_price) / buy_price) * 100
-    if profit_pct <= -7: return "❌ CẮT LỖ KHẨN CẤP"
-    if profit_pct >= 15: return "💰 CHỐT LỜI TỪNG PHẦN"
-    if -3 <= profit_pct <= 3: return "💎 TIẾP TỤC NẮM GIỮ"
-    return "⚖️ Theo dõi sát"
+def get_action_recommendations(current_prices, buy_prices):
+    # Khuyến nghị cho cả danh mục trong một lượt vector hóa
+    curr = np.asarray(current_prices, dtype=float)
+    buy = np.asarray(buy_prices, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_pct = (curr - buy) / buy * 100
+    return np.select(
+        [(curr == 0) | (buy == 0), profit_pct <= -7, profit_pct >= 15, (profit_pct >= -3) & (profit_pct <= 3)],
+        ["⌛ Đang theo dõi...", "❌ CẮT LỖ KHẨN CẤP", "💰 CHỐT LỜI TỪNG PHẦN", "💎 TIẾP TỤC NẮM GIỮ"],
+        default="⚖️ Theo dõi sát"
+    )
 
 # =============================================================================
 # KHỞI TẠO DỮ LIỆU TRONG SESSION (BỘ NHỚ TẠM)
@@ -71,25 +67,20 @@ if st.button("🔄 CẬP NHẬT GIÁ VÀ KHUYẾN NGHỊ REAL-TIME"):
     st.session_state.portfolio_df = edited_df
     
     with st.spinner("Sói già đang check bảng điện..."):
-        # Tính toán các cột tự động
-        current_prices = []
-        recommendations = []
-        profits = []
+        # Lấy giá theo lô (bỏ trùng, tải song song, có bộ đệm), rồi tính các cột tự động
+        tickers = edited_df["Mã CP"].map(lambda t: t.strip().upper() if isinstance(t, str) else "")
+        with timed_stage('portfolio.refresh'): prices = get_current_prices(tickers)
+        current_prices = tickers.map(lambda t: prices.get(t, 0)).astype(float)
+        buy_prices = pd.to_numeric(edited_df["Giá vốn"], errors="coerce")
 
-        for ticker, buy_p in zip(edited_df["Mã CP"], edited_df["Giá vốn"]):
-            curr = get_current_price(ticker)
-            current_prices.append(curr)
-            recommendations.append(get_action_recommendation(curr, buy_p))
-            if buy_p > 0 and curr > 0:
-                profits.append(f"{((curr - buy_p) / buy_p * 100):+.2f}%")
-            else:
-                profits.append("0%")
+        profit_pct = (current_prices - buy_prices) / buy_prices * 100
+        has_profit = (buy_prices > 0) & (current_prices > 0)
 
         # Hiển thị bảng kết quả cuối cùng
         final_df = edited_df.copy()
         final_df["Giá hiện tại"] = current_prices
-        final_df["% Lãi/Lỗ"] = profits
-        final_df["KHUYẾN NGHỊ"] = recommendations
+        final_df["% Lãi/Lỗ"] = profit_pct.map("{:+.2f}%".format).where(has_profit, "0%")
+        final_df["KHUYẾN NGHỊ"] = get_action_recommendations(current_prices, buy_prices)
 
         st.divider()
         st.subheader("📊 Bảng Theo Dõi Chuyên Sâu")
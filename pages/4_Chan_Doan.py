@@ -0,0 +1,48 @@
+import streamlit as st
+import pandas as pd
+from core.cache import cache_stats
+from core import metrics
+from core.metrics import registry, render_prometheus, stage_rows
+
+st.set_page_config(page_title="Wolf Diagnostics - Chẩn đoán hệ thống", layout="wide", page_icon="🩺")
+st.markdown("""
+<style>
+    .main {background-color: #f4f6f9;}
+    .diag-header { background: #fff; padding: 20px; border-radius: 12px; border-bottom: 4px solid #8e44ad; text-align: center; box-shadow: 0 4px 6px rgba(0,0,0,0.05); margin-bottom: 20px; }
+    .header-title { font-size: 32px; font-weight: 900; color: #2c3e50; margin: 0; }
+</style>
+""", unsafe_allow_html=True)
+
+# =============================================================================
+# GIAO DIỆN CHÍNH
+# =============================================================================
+st.markdown("<div class='diag-header'><h1 class='header-title'>🩺 CHẨN ĐOÁN HỆ THỐNG</h1></div>", unsafe_allow_html=True)
+st.caption("Số liệu tính từ lúc tiến trình Streamlit khởi động, dùng chung cho mọi phiên.")
+
+c1, c2 = st.columns(2)
+with c1: st.button("🔄 Làm mới", use_container_width=True)
+with c2:
+    if st.button("🧹 Xóa số liệu đo", use_container_width=True): registry.reset()
+
+rows = pd.DataFrame(stage_rows())
+st.subheader("⏱️ Độ trễ nguồn dữ liệu & công đoạn")
+if rows.empty: st.info("Chưa có số liệu. Hãy chạy Phân tích, Radar hoặc Cập nhật giá trước.")
+else:
+    st.dataframe(rows.round(1), use_container_width=True, hide_index=True)
+
+counters, _ = registry.snapshot()
+errors = pd.DataFrame([{**dict(labels), 'Số lần': value} for (name, labels), value in counters.items() if name == 'wolf_errors_total'])
+st.subheader("⚠️ Lỗi đã xử lý")
+if errors.empty: st.success("Không có lỗi nào.")
+else: st.dataframe(errors.sort_values('Số lần', ascending=False), use_container_width=True, hide_index=True)
+
+st.subheader("🗄️ Bộ đệm dùng chung")
+st.dataframe(pd.DataFrame(cache_stats()), use_container_width=True, hide_index=True)
+
+st.subheader("📤 Xuất Prometheus")
+if metrics.exporter_error: st.warning(f"Không mở được /metrics ({metrics.exporter_error}). Mỗi tiến trình cần WOLF_METRICS_PORT riêng.")
+elif metrics.exporter is not None: st.caption(f"Prometheus đọc tại http://<máy chủ>:{metrics.exporter.server_port}/metrics")
+else: st.caption("Đặt WOLF_METRICS_PORT (mỗi tiến trình một cổng) để Prometheus đọc trực tiếp /metrics.")
+text = render_prometheus()
+st.download_button("⬇️ Tải metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+with st.expander("Xem nội dung"): st.code(text, language="text")
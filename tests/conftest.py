@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Chạy từ thư mục gốc như Streamlit: 'core' nhập được trực tiếp
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest import equity_curve, panel_inputs, simulate, summarize
+from core.bars import BarPanel
+from core.store import BAR_DTYPE
+
+
+def run(close, **params):
+    close = np.asarray(close, dtype=float)
+    rets, days, entries = simulate(close, np.ones_like(close, dtype=bool), **params)
+    return summarize(rets, days, entries, close)
+
+
+def test_steady_uptrend_never_beats_buy_and_hold():
+    # Tăng 1%/phiên: mọi lệnh chốt lời +15% sau 15 phiên, lệnh cuối vào phiên 179, ra phiên 194.
+    # Luôn có lệnh mở từ phiên 1 đến 194, mỗi phiên +1% -> 1.01^194 (mua và giữ: 1.01^199)
+    res = run([1.01 ** np.arange(200)], stop=-7.0, take=15.0, hold=20)
+    assert res['trades'] == 180
+    assert res['total_return'] == pytest.approx((1.01 ** 194 - 1) * 100)
+    assert res['max_drawdown'] == 0
+
+
+def test_steady_downtrend_drawdown_is_whole_loss():
+    # Giảm 1%/phiên: cắt lỗ sau 8 phiên, lệnh cuối ra phiên 187
+    res = run([0.99 ** np.arange(200)], stop=-7.0, take=15.0, hold=20)
+    assert res['total_return'] == pytest.approx((0.99 ** 187 - 1) * 100)
+    assert res['max_drawdown'] == pytest.approx(res['total_return'])
+
+
+def test_equity_matches_position_loop():
+    rng = np.random.default_rng(0)
+    close = np.cumprod(1 + rng.normal(0, 0.02, (5, 300)), axis=1)
+    rets, days, (ti, di) = simulate(close, rng.random(close.shape) < 0.05)
+    expected = [1.0]
+    for j in range(1, close.shape[1]):
+        live = [close[t, j] / close[t, j - 1] - 1 for t, d, h in zip(ti, di, days) if d < j <= d + h]
+        expected.append(expected[-1] * (1 + (np.mean(live) if live else 0)))
+    np.testing.assert_allclose(equity_curve(close, days, (ti, di)), expected)
+
+
+def test_indicators_skip_missing_sessions_like_radar():
+    # Mã B nghỉ một phiên giữa chừng: MA50/RSI vẫn tính trên chuỗi riêng của B như Radar
+    days = np.arange(120, dtype=np.int64) * 86400
+    rng = np.random.default_rng(1)
+    bars = {}
+    for name, keep in (('A', np.ones(120, bool)), ('B', np.arange(120) != 60)):
+        t = days[keep]
+        c = np.cumprod(1 + rng.normal(0, 0.02, len(t))) * 20
+        bars[name] = np.array(list(zip(t, c, c, c, c, np.full(len(t), 10 ** 6))), dtype=BAR_DTYPE)
+    panel = BarPanel.from_bars(bars)
+    close, ind = panel_inputs(panel)
+    b = pd.Series(bars['B']['c'])
+    on_b = panel.valid[1]
+    np.testing.assert_allclose(ind['MA_50'][1, on_b], b.rolling(50).mean(), rtol=1e-6)
+    assert not np.isnan(ind['MA_50'][1, 61:]).any()
+    assert np.isnan(ind['RSI'][1, 60]) and close[1, 60] == close[1, 59]
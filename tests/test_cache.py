@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from core.cache import MISSING, MemoryBackend, SharedCache, SQLiteBackend
+
+N = 16
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend_factory(request, tmp_path):
+    if request.param == 'memory': return lambda max_entries: MemoryBackend(max_entries)
+    return lambda max_entries: SQLiteBackend('test', max_entries, tmp_path / 'cache.sqlite')
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "hết thời gian chờ"
+        time.sleep(0.001)
+
+
+def run_threads(fn):
+    results = [None] * N
+    def worker(i):
+        try: results[i] = fn()
+        except Exception as e: results[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(N)]
+    for t in threads: t.start()
+    for t in threads: t.join(10)
+    return results
+
+
+def test_concurrent_misses_call_loader_once():
+    cache = SharedCache('t', ttl=60, backend=MemoryBackend())
+    calls = []
+    def loader():
+        calls.append(1)
+        wait_for(lambda: cache.counters['coalesced'] == N - 1)  # mọi luồng khác đã vào chờ
+        return 'value'
+    assert run_threads(lambda: cache.get_or_load('k', loader)) == ['value'] * N
+    assert len(calls) == 1
+    assert cache.stats() == {'name': 't', 'size': 1, 'inflight': 0, 'hits': 0, 'misses': N, 'evictions': 0, 'coalesced': N - 1, 'errors': 0}
+    assert cache.get_or_load('k', loader) == 'value' and len(calls) == 1
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached():
+    cache = SharedCache('t', ttl=60, backend=MemoryBackend())
+    calls = []
+    def failing():
+        calls.append(1)
+        wait_for(lambda: cache.counters['coalesced'] == N - 1)
+        raise LookupError('nguồn lỗi')
+    results = run_threads(lambda: cache.get_or_load('k', failing))
+    assert all(isinstance(r, LookupError) for r in results)
+    assert len(calls) == 1 and cache.counters['errors'] == 1 and len(cache.backend) == 0
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
+
+
+def test_lru_eviction_order_and_counts(backend_factory):
+    cache = SharedCache('t', ttl=60, backend=backend_factory(3))
+    for k in 'abc': cache.put(k, k.upper())
+    assert cache.get('a') == 'A'  # a thành mới dùng nhất, b là cũ nhất
+    cache.put('d', 'D')
+    assert cache.get('b') is None
+    cache.put('e', 'E')
+    assert cache.get('c') is None
+    assert [cache.get(k) for k in 'ade'] == ['A', 'D', 'E']
+    assert cache.counters['evictions'] == 2 and len(cache.backend) == 3
+
+
+def test_backend_set_reports_evictions(backend_factory):
+    backend = backend_factory(2)
+    assert [backend.set(k, k, 60) for k in 'abcd'] == [0, 0, 1, 1]
+    assert backend.get('a') is MISSING and backend.get('b') is MISSING and backend.get('d') == 'd'
+
+
+def test_ttl_expiry(backend_factory):
+    cache = SharedCache('t', ttl=0.05, backend=backend_factory(10))
+    cache.put('k', {'x': 1})
+    assert cache.get('k') == {'x': 1}
+    time.sleep(0.06)
+    assert cache.get('k', 'mặc định') == 'mặc định'
+    assert len(cache.backend) == 0
+
+
+def test_sqlite_backend_is_shared_between_connections(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    SQLiteBackend('news', 10, path).set('HPG', [{'title': 't'}], 60)
+    assert SQLiteBackend('news', 10, path).get('HPG') == [{'title': 't'}]
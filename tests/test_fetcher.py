@@ -0,0 +1,78 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from core.fetcher import HistoryFetcher, HostRateLimiter
+
+
+@pytest.fixture
+def scripted():
+    # Máy chủ trả lần lượt các (mã trạng thái, nội dung) đã định, lặp lại phần tử cuối
+    state = {'script': [], 'calls': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body = state['script'][min(state['calls'], len(state['script']) - 1)]
+            state['calls'] += 1
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args): pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    state['fetcher'] = HistoryFetcher(base_url=f"http://127.0.0.1:{httpd.server_port}/dchart/history", rate_per_host=0, backoff=0)
+    yield state
+    httpd.shutdown()
+
+
+def test_client_error_is_not_retried(scripted):
+    scripted['script'] = [(404, b'{}')]
+    with pytest.raises(requests.HTTPError):
+        scripted['fetcher'].fetch_raw('XXX', 0, 1)
+    assert scripted['calls'] == 1
+
+
+def test_bad_json_is_not_retried(scripted):
+    scripted['script'] = [(200, b'<html>')]
+    with pytest.raises(ValueError):
+        scripted['fetcher'].fetch_raw('HPG', 0, 1)
+    assert scripted['calls'] == 1
+
+
+def test_retry_status_is_retried(scripted):
+    scripted['script'] = [(503, b''), (429, b''), (200, b'{"s": "ok"}')]
+    assert scripted['fetcher'].fetch_raw('HPG', 0, 1) == {'s': 'ok'}
+    assert scripted['calls'] == 3
+
+
+def test_run_many_dedupes_bounds_concurrency_and_drops_failures():
+    fetcher = HistoryFetcher(max_workers=4)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def work(ticker):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock: running[0] -= 1
+        if ticker == 'ERR': raise requests.ConnectionError('lỗi')
+        return None if ticker == 'NONE' else ticker.lower()
+
+    done = []
+    out = fetcher.run_many(work, ['hpg', 'HPG', 'ERR', 'NONE', ''] + [f"T{i}" for i in range(12)], on_done=lambda d, n, t: done.append(d))
+    assert out == {'HPG': 'hpg', **{f"T{i}": f"t{i}" for i in range(12)}}
+    assert peak[0] == 4 and done == list(range(1, 16))
+
+
+def test_rate_limiter_paces_per_host():
+    limiter = HostRateLimiter(rate=100, burst=1)
+    start = time.perf_counter()
+    for _ in range(11): limiter.acquire('a')
+    limiter.acquire('b')  # host khác có bucket riêng
+    assert 0.09 <= time.perf_counter() - start < 0.5
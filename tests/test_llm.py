@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from core.llm import CachedLLM, LLMCache
+
+
+class FakeModel:
+    # Model giả chạy cục bộ: đếm số lần gọi, có thể lỗi giữa chừng khi stream
+    name = 'fake'
+
+    def __init__(self, chunks=('Sói ', 'già ', 'nói.'), fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return f"trả lời: {prompt}"
+
+    def stream(self, prompt):
+        self.calls += 1
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after: raise RuntimeError('mất kết nối')
+            yield chunk
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(root=tmp_path, ttl=60, max_entries=10)
+
+
+def cached_text(llm, prompt):
+    return llm.cache.get(llm._key(prompt))
+
+
+def test_repeated_prompt_skips_backend(cache):
+    model = FakeModel()
+    llm = CachedLLM(model, cache)
+    assert llm.generate('HPG') == llm.generate('HPG') == 'trả lời: HPG'
+    assert model.calls == 1
+    llm.generate('SSI')
+    assert model.calls == 2
+
+
+def test_stream_caches_only_after_last_chunk(cache):
+    model = FakeModel()
+    llm = CachedLLM(model, cache)
+    stream = llm.stream('HPG')
+    assert [next(stream) for _ in model.chunks] == list(model.chunks)
+    assert cached_text(llm, 'HPG') is None
+    assert list(stream) == []
+    assert cached_text(llm, 'HPG') == 'Sói già nói.'
+    assert list(llm.stream('HPG')) == ['Sói già nói.'] and model.calls == 1
+
+
+def test_failed_stream_is_not_cached(cache):
+    llm = CachedLLM(FakeModel(fail_after=2), cache)
+    with pytest.raises(RuntimeError):
+        for _ in llm.stream('HPG'): pass
+    assert cached_text(llm, 'HPG') is None
+
+
+def test_abandoned_stream_is_not_cached(cache):
+    llm = CachedLLM(FakeModel(), cache)
+    stream = llm.stream('HPG')
+    next(stream)
+    stream.close()
+    assert cached_text(llm, 'HPG') is None
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMCache(root=tmp_path, ttl=0.05)
+    cache.put('k', 'văn bản')
+    assert cache.get('k') == 'văn bản'
+    time.sleep(0.06)
+    assert cache.get('k') is None
+    assert not (tmp_path / 'k.json').exists()
+
+
+def test_lru_pruning_keeps_recently_used(tmp_path):
+    cache = LLMCache(root=tmp_path, ttl=60, max_entries=2)
+    for key in ('a', 'b'):
+        cache.put(key, key)
+        time.sleep(0.01)  # mtime phân biệt được thứ tự dùng
+    assert cache.get('a') == 'a'
+    time.sleep(0.01)
+    cache.put('c', 'c')
+    assert [cache.get(k) for k in 'abc'] == ['a', None, 'c']
@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from core.cache import MemoryBackend, SharedCache
+from core.news import NewsService, format_stories, latest_headline
+
+
+class StubProvider:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def search(self, ticker, limit=5):
+        with self._lock: self.calls.append(ticker)
+        if ticker in self.fail: raise ConnectionError('Google News chặn')
+        return [{'title': f"{ticker} tin {i}", 'date': '1 ngày trước'} for i in range(limit)]
+
+
+@pytest.fixture
+def service():
+    svc = NewsService(StubProvider(fail={'ERR'}), cache=SharedCache('news-test', ttl=60, backend=MemoryBackend()), limit=2)
+    yield svc
+    svc.pool.shutdown()
+
+
+def test_second_lookup_hits_cache(service):
+    first = service.get('hpg')
+    assert service.get('HPG') == first == [{'title': 'HPG tin 0', 'date': '1 ngày trước'}, {'title': 'HPG tin 1', 'date': '1 ngày trước'}]
+    assert service.provider.calls == ['HPG']
+    assert service.cache.counters['hits'] == 1
+
+
+def test_provider_error_is_not_cached(service):
+    for _ in range(2):
+        with pytest.raises(ConnectionError): service.get('ERR')
+    assert service.provider.calls == ['ERR', 'ERR']
+    assert len(service.cache.backend) == 0
+
+
+def test_prefetch_dedupes_and_returns_futures(service):
+    futures = service.prefetch(['HPG', 'SSI', 'HPG', 'ERR'])
+    assert list(futures) == ['HPG', 'SSI', 'ERR']
+    assert latest_headline(futures['SSI']) == 'SSI tin 0'
+    assert latest_headline(futures['ERR']) == "Theo dòng tiền"
+    assert sorted(service.provider.calls) == ['ERR', 'HPG', 'SSI']
+
+
+def test_fallbacks():
+    assert latest_headline([]) == "Chưa có tin hot"
+    assert latest_headline([{'title': 'Tin A', 'date': 'hôm nay'}]) == 'Tin A'
+    assert format_stories([]) == "Không tìm thấy câu chuyện riêng đáng chú ý trong tuần qua."
+    assert format_stories([{'title': 'Tin A', 'date': 'hôm nay'}]) == "- Tin A (hôm nay)"
+
+
+def test_fetch_async_returns_formatted_stories(service):
+    assert service.fetch_async('HPG').result() == "- HPG tin 0 (1 ngày trước)\n- HPG tin 1 (1 ngày trước)"
+    with pytest.raises(ConnectionError): service.fetch_async('ERR').result()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from core.screening import query_snapshot
+
+
+def snapshot():
+    return pd.DataFrame({
+        'Mã CK': ['AAA', 'BBB', 'CCC', 'DDD'],
+        'Giá': [10.0, 20.0, 30.0, 40.0],
+        '% Đổi': [1.0, 3.0, 2.0, -1.0],
+        'RSI': [50.0, 55.0, 60.0, 65.0],
+        'Trên MA50': [True] * 4,
+        'MACD Khỏe': [True] * 4,
+        'Vol Ratio': [1.0] * 4,
+        'Vol_MA20': [10 ** 6] * 4,
+        'GTGD': [10 ** 7] * 4,
+        'Gom gần nhất': [7.0, 0.0, np.nan, 3.0],
+    })
+
+
+def test_default_direction_per_column():
+    assert list(query_snapshot(snapshot(), 0, 100, False, True, sort_by='% Đổi')['Mã CK']) == ['BBB', 'CCC', 'AAA', 'DDD']
+    # Vào hàng gần nhất lên đầu, mã chưa từng có tín hiệu xuống cuối
+    assert list(query_snapshot(snapshot(), 0, 100, False, True, sort_by='Gom gần nhất')['Mã CK']) == ['BBB', 'DDD', 'AAA', 'CCC']
+
+
+def test_explicit_direction_overrides_default():
+    res = query_snapshot(snapshot(), 0, 100, False, True, sort_by='Gom gần nhất', ascending=False, top_n=2)
+    assert list(res['Mã CK']) == ['AAA', 'DDD']
+    assert list(query_snapshot(snapshot(), 0, 100, False, True, sort_by='RSI', ascending=True)['Mã CK']) == ['AAA', 'BBB', 'CCC', 'DDD']
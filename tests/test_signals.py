@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from core.signals import SIGNAL_LABELS, bars_since, classify_vsa, detect_smart_money, vsa_panel
+
+
+def random_bars(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.cumprod(1 + rng.normal(0, 0.03, n))
+    open_p = close * (1 + rng.normal(0, 0.02, n))
+    open_p[::17] = close[::17]  # nến doji
+    high = np.maximum(open_p, close) * (1 + rng.exponential(0.01, n))
+    low = np.minimum(open_p, close) * (1 - rng.exponential(0.01, n))
+    high[::23] = low[::23] = open_p[::23] = close[::23]  # biên độ 0
+    volume = rng.integers(10 ** 5, 10 ** 6, n).astype(float) * np.where(rng.random(n) < 0.2, 3, 1)
+    volume[40:70] = 0  # Vol_MA20 = 0 -> không xác định
+    return open_p, high, low, close, volume
+
+
+def test_vectorised_matches_scalar_bar_for_bar():
+    open_p, high, low, close, volume = random_bars(5000)
+    vol_ma20 = pd.Series(volume).rolling(20).mean().to_numpy()
+    codes = classify_vsa(open_p, high, low, close, volume, vol_ma20)
+    expected = [detect_smart_money(*bar) for bar in zip(open_p, high, low, close, volume, vol_ma20)]
+    assert [SIGNAL_LABELS[c] for c in codes] == expected
+    assert len(set(expected)) == 4
+
+
+def test_panel_matches_per_ticker_rows():
+    bars = [random_bars(300, seed) for seed in range(4)]
+    panel = vsa_panel(*(np.stack(field) for field in zip(*bars)))
+    for row, b in zip(panel, bars):
+        np.testing.assert_array_equal(row, classify_vsa(*b[:4], b[4], pd.Series(b[4]).rolling(20).mean().to_numpy()))
+
+
+def test_bars_since():
+    codes = np.array([[1, 0, 0, 1, 0], [0, 0, 0, 0, 0], [0, 0, 0, 0, 1]], dtype=np.int8)
+    np.testing.assert_array_equal(bars_since(codes, 1), [1, np.nan, 0])
@@ -0,0 +1,57 @@
+import math
+import time
+
+import numpy as np
+
+from core.cache import MemoryBackend, SharedCache
+from core.store import BAR_BUDGET, MAX_HISTORY_DAYS, RESOLUTIONS, SESSION_MINUTES, BarStore
+
+DAY = 86400
+
+
+class FakeFetcher:
+    # Mã niêm yết cách đây 100 ngày: nến đầu tiên nằm trong cửa sổ 365 ngày
+    def __init__(self, listed_days_ago=100):
+        now = int(time.time()) // DAY * DAY
+        self.t = list(range(now - listed_days_ago * DAY, now, DAY))  # phiên hôm nay chưa có
+        self.requests = []
+
+    def fetch_raw(self, ticker, from_ts, to_ts, resolution='D'):
+        self.requests.append(from_ts)
+        t = [x for x in self.t if from_ts <= x <= to_ts]
+        if not t: return {'s': 'no_data'}
+        return {'s': 'ok', 't': t, 'o': [10.0] * len(t), 'h': [11.0] * len(t), 'l': [9.0] * len(t), 'c': [10.5] * len(t), 'v': [1000] * len(t)}
+
+
+def make_store(tmp_path, fetcher):
+    return BarStore(root=tmp_path, fetcher=fetcher, max_age=0, cache=SharedCache('bars-test', ttl=0, backend=MemoryBackend()))
+
+
+def test_recent_listing_syncs_delta_after_first_download(tmp_path):
+    fetcher = FakeFetcher()
+    store = make_store(tmp_path, fetcher)
+    first = store.sync('NEW')
+    assert len(first) == 100
+    assert fetcher.requests[0] < fetcher.t[0]  # lần đầu tải cả cửa sổ
+    fetcher.t.append(fetcher.t[-1] + DAY)
+    second = store.sync('NEW')
+    assert fetcher.requests[1] == fetcher.t[-2]  # chỉ tải từ nến cuối đã lưu
+    assert len(second) == 101 and np.all(np.diff(second['t']) > 0)
+    assert store.coverage('NEW') == fetcher.requests[0]
+
+
+def test_store_without_coverage_file_falls_back_to_first_bar(tmp_path):
+    fetcher = FakeFetcher(listed_days_ago=400)
+    store = make_store(tmp_path, fetcher)
+    store.sync('OLD')
+    store.coverage_path('OLD').unlink()
+    store.sync('OLD')
+    assert fetcher.requests[1] == fetcher.t[-1]
+
+
+def test_history_depth_follows_one_bar_budget():
+    # Khung càng nhỏ thì càng ít ngày, không file nào vượt ngân sách nến
+    days = [RESOLUTIONS[r] for r in ('D', '60', '15', '5', '1')]
+    assert days == sorted(days, reverse=True) and max(days) == MAX_HISTORY_DAYS
+    for r in ('60', '15', '5', '1'):
+        assert RESOLUTIONS[r] * 5 / 7 * math.ceil(SESSION_MINUTES / int(r)) <= BAR_BUDGET * 1.01
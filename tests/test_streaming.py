@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.bars import BarPanel
+from core.indicators import compute_indicators
+from core.screening import build_snapshot
+from core.store import BAR_DTYPE
+from core.streaming import IncrementalIndicators, StateBook
+
+NAMES = ['EMA_20', 'MA_20', 'MA_50', 'RSI', 'MACD', 'MACD_Signal', 'Vol_MA20', 'Vol_Ratio']
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    close = 20 * np.cumprod(1 + rng.normal(0, 0.02, 300))
+    close[100:130] = np.linspace(close[99], close[99] * 1.3, 30)  # chuỗi tăng liền: loss = 0 -> RSI 100
+    volume = rng.integers(10 ** 5, 10 ** 6, 300).astype(float)
+    return close, volume
+
+
+def streamed(close, volume, state=None):
+    state = state or IncrementalIndicators()
+    rows = [state.update(t, c, v) for t, (c, v) in enumerate(zip(close, volume))]
+    return {k: np.array([r[k] for r in rows]) for k in NAMES}
+
+
+def pandas_reference(close, volume):
+    close, volume = pd.Series(close), pd.Series(volume)
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    vol_ma20 = volume.rolling(20).mean()
+    return {
+        'EMA_20': close.ewm(span=20).mean(), 'MA_20': close.rolling(20).mean(), 'MA_50': close.rolling(50).mean(),
+        'RSI': 100 - 100 / (1 + gain / loss), 'MACD': macd, 'MACD_Signal': macd.ewm(span=9).mean(),
+        'Vol_MA20': vol_ma20, 'Vol_Ratio': volume / vol_ma20,
+    }
+
+
+def test_matches_batch_engine(series):
+    close, volume = series
+    batch = compute_indicators(close[None, :], volume[None, :])
+    got = streamed(close, volume)
+    for k in NAMES: np.testing.assert_allclose(got[k], batch[k][0], rtol=1e-9, err_msg=k)
+
+
+def test_matches_pandas(series):
+    close, volume = series
+    ref = pandas_reference(close, volume)
+    got = streamed(close, volume)
+    for k in NAMES: np.testing.assert_allclose(got[k], ref[k].to_numpy(), rtol=1e-9, err_msg=k)
+    assert (got['RSI'][115:130] == 100).all()
+
+
+def test_state_round_trips_through_json(series):
+    close, volume = series
+    state = IncrementalIndicators()
+    for t in range(200): state.update(t, close[t], volume[t])
+    restored = IncrementalIndicators.from_dict(json.loads(json.dumps(state.to_dict())))
+    assert restored.values() == pytest.approx(state.values(), nan_ok=True)
+    for t in range(200, 300):
+        assert restored.update(t, close[t], volume[t]) == pytest.approx(state.update(t, close[t], volume[t]), nan_ok=True)
+
+
+def test_preview_and_stale_bars_leave_state_unchanged(series):
+    close, volume = series
+    state = IncrementalIndicators()
+    for t in range(100): state.update(t, close[t], volume[t])
+    before = state.to_dict()
+    state.preview(100, close[100] * 1.1, volume[100])
+    state.update(99, close[0], volume[0])
+    assert state.to_dict() == before
+
+
+def test_snapshot_from_state_book_matches_batch(tmp_path, series):
+    close, volume = series
+    bars = {}
+    for k, name in enumerate(('AAA', 'BBB', 'CCC')):
+        c = close * (1 + 0.1 * k)
+        t = np.arange(len(c), dtype=np.int64)[k:] * 86400  # độ dài lịch sử khác nhau
+        bars[name] = np.array(list(zip(t, c[k:], c[k:], c[k:], c[k:], volume[k:].astype(np.int64))), dtype=BAR_DTYPE)
+    panel = BarPanel.from_bars(bars)
+    book = StateBook(tmp_path / 'indicators.json')
+    latest = {t: book.advance(t, b) for t, b in bars.items()}
+    pd.testing.assert_frame_equal(build_snapshot(panel, latest=latest), build_snapshot(panel), rtol=1e-5)